@@ -0,0 +1,162 @@
+"""Bulk import of TPO and student accounts from CSV.
+
+Rows are processed in chunks: usernames and emails are checked against the
+database with one IN lookup per chunk, passwords are hashed in parallel on
+the password pool, and the accepted rows go in with a single bulk INSERT.
+Every input row gets a line in the report, created or rejected. A chunk whose
+passwords cannot be hashed because the pool stays busy with logins is
+rejected as a whole and the import moves on; those rows can be re-imported.
+
+Expected columns (header row required):
+
+    username,email,user_type,password,first_name,last_name,institute,department
+
+``user_type`` is ``tpo`` or ``student``. When ``password`` is blank a random
+temporary one is generated and written to the report. Imported accounts must
+reset their password on first login.
+"""
+import secrets
+import time
+
+from sqlalchemy import insert, select
+
+from passwords import PasswordHasherBusy
+
+IMPORT_USER_TYPES = ('tpo', 'student')
+REPORT_FIELDS = ['row', 'username', 'email', 'user_type', 'status', 'message', 'temporary_password']
+OPTIONAL_FIELDS = ('first_name', 'last_name', 'institute', 'department')
+
+
+def _clean(row):
+    return {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+
+
+def _validate(row):
+    if not row.get('username'):
+        return 'username is required'
+    if len(row['username']) > 80:
+        return 'username must be at most 80 characters'
+    if not row.get('email') or '@' not in row['email']:
+        return 'a valid email is required'
+    if len(row['email']) > 120:
+        return 'email must be at most 120 characters'
+    if row.get('user_type') not in IMPORT_USER_TYPES:
+        return f"user_type must be one of {', '.join(IMPORT_USER_TYPES)}"
+    return None
+
+
+def import_accounts(session, User, hasher, rows, report, created_by, chunk_size=500):
+    """Import ``rows`` (dicts, e.g. from csv.DictReader) and write one report line per row.
+
+    ``report`` is a csv.DictWriter over REPORT_FIELDS. Returns a summary dict
+    with created/rejected counts and throughput.
+    """
+    start = time.perf_counter()
+    created = rejected = 0
+    seen_usernames = set()
+    seen_emails = set()
+
+    chunk = []
+    for row_number, raw in enumerate(rows, 2):  # row 1 is the CSV header
+        chunk.append((row_number, _clean(raw)))
+        if len(chunk) >= chunk_size:
+            c, r = _import_chunk(session, User, hasher, chunk, report, created_by, seen_usernames, seen_emails)
+            created, rejected, chunk = created + c, rejected + r, []
+    if chunk:
+        c, r = _import_chunk(session, User, hasher, chunk, report, created_by, seen_usernames, seen_emails)
+        created, rejected = created + c, rejected + r
+
+    elapsed = time.perf_counter() - start
+    total = created + rejected
+    return {
+        'rows': total,
+        'created': created,
+        'rejected': rejected,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(total / elapsed, 1) if elapsed else 0.0
+    }
+
+
+def _import_chunk(session, User, hasher, chunk, report, created_by, seen_usernames, seen_emails):
+    accepted = []
+    results = []
+
+    candidates = [row for _, row in chunk if not _validate(row)]
+    for row in candidates:
+        row['username_normalized'] = User.normalize(row['username'])
+        row['email_normalized'] = User.normalize(row['email'])
+    usernames = {row['username_normalized'] for row in candidates}
+    emails = {row['email_normalized'] for row in candidates}
+    taken_usernames = set(session.execute(select(User.username_normalized).where(
+        User.username_normalized.in_(usernames))).scalars()) if usernames else set()
+    taken_emails = set(session.execute(select(User.email_normalized).where(
+        User.email_normalized.in_(emails))).scalars()) if emails else set()
+
+    for row_number, row in chunk:
+        result = {
+            'row': row_number,
+            'username': row.get('username', ''),
+            'email': row.get('email', ''),
+            'user_type': row.get('user_type', '')
+        }
+        error = _validate(row)
+        if not error:
+            if row['username_normalized'] in taken_usernames or row['username_normalized'] in seen_usernames:
+                error = 'Username already exists'
+            elif row['email_normalized'] in taken_emails or row['email_normalized'] in seen_emails:
+                error = 'Email already exists'
+        if error:
+            result.update(status='rejected', message=error)
+        else:
+            seen_usernames.add(row['username_normalized'])
+            seen_emails.add(row['email_normalized'])
+            if not row.get('password'):
+                row['password'] = result['temporary_password'] = secrets.token_urlsafe(12)
+            result.update(status='created', message='')
+            accepted.append(row)
+        results.append(result)
+
+    hashes = None
+    if accepted:
+        try:
+            hashes = hasher.hash_many([row['password'] for row in accepted])
+        except PasswordHasherBusy:
+            _reject_accepted(results, accepted, seen_usernames, seen_emails,
+                             'Password hashing busy, chunk not imported')
+    if hashes is not None:
+        values = []
+        for row, password_hash in zip(accepted, hashes):
+            value = {field: row.get(field) or None for field in OPTIONAL_FIELDS}
+            value.update(
+                username=row['username'],
+                username_normalized=row['username_normalized'],
+                email=row['email'],
+                email_normalized=row['email_normalized'],
+                user_type=row['user_type'],
+                password_hash=password_hash,
+                created_by=created_by,
+                requires_password_reset=True
+            )
+            values.append(value)
+        try:
+            session.execute(insert(User), values)
+            session.commit()
+        except Exception:
+            session.rollback()
+            _reject_accepted(results, accepted, seen_usernames, seen_emails, 'Database error, chunk rolled back')
+
+    created = 0
+    for result in results:
+        if result['status'] == 'created':
+            created += 1
+        report.writerow(result)
+    return created, len(results) - created
+
+
+def _reject_accepted(results, accepted, seen_usernames, seen_emails, message):
+    for result in results:
+        if result['status'] == 'created':
+            result.update(status='rejected', message=message, temporary_password='')
+    for row in accepted:
+        seen_usernames.discard(row['username_normalized'])
+        seen_emails.discard(row['email_normalized'])
@@ -1,31 +1,270 @@
-from flask import Flask, request, jsonify, render_template, redirect, url_for, flash
+from flask import Flask, Response, request, jsonify, redirect, url_for, flash, stream_with_context, send_file
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import and_, or_, insert, select, literal, func, case
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError
+from sqlalchemy.orm import validates
 import os
+import re
+import base64
+import tempfile
+import json
+import csv
+import io
+import click
+import logging
+import time
 from dotenv import load_dotenv
-from datetime import timedelta, datetime
+from werkzeug.middleware.proxy_fix import ProxyFix
+from datetime import timedelta, datetime, timezone
+from search import install_job_search, search_jobs, rebuild_job_search
+from rollups import NO_INSTITUTE, install_rollups, rebuild_rollups
+from passwords import PasswordHasher, PasswordHasherBusy
+from shared_state import TokenBuckets, VersionTable
+from ratelimit import RateLimiter
+from profile_cache import ProfileCache
+from response_cache import SharedResponseCache
+from recommend import JobMatcher
+from tasks import TaskQueue
+from dbpool import engine_options, database_health, pool_wait_stats
+from replicas import ReplicaRouter, RoutingSession
+from ingest import RecordError, iter_records, batched
+from account_import import REPORT_FIELDS, import_accounts
+from applog import setup_logging, log_stats
+from metrics import metrics
+from export import EXPORT_FORMATS, export_stream
+from seed_data import seed_database
+from json_provider import FastJSONProvider
+from static_pages import StaticPages
+from compression import Compression
 
 # Load environment variables
 load_dotenv()
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson when installed; encodes Rows and ISO datetimes
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])  # DB_POOL_* variables
+app.config['DATABASE_REPLICA_URLS'] = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+app.config['DB_REPLICA_EJECT_SECONDS'] = float(os.getenv('DB_REPLICA_EJECT_SECONDS', 30))  # Skip a failing replica this long
+app.config['DB_READ_YOUR_WRITES_SECONDS'] = float(os.getenv('DB_READ_YOUR_WRITES_SECONDS', 5))  # Reads stay on the primary after a user's write
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'your-jwt-secret-key-here')
 app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(days=1)  # Extend token expiration to 1 day
 app.config['JWT_TOKEN_LOCATION'] = ['headers']
 app.config['JWT_HEADER_NAME'] = 'Authorization'
 app.config['JWT_HEADER_TYPE'] = 'Bearer'
+app.config['JOBS_PAGE_SIZE'] = int(os.getenv('JOBS_PAGE_SIZE', 50))
+app.config['JOBS_PAGE_SIZE_MAX'] = int(os.getenv('JOBS_PAGE_SIZE_MAX', 200))
+app.config['JOB_BULK_BATCH_SIZE'] = int(os.getenv('JOB_BULK_BATCH_SIZE', 1000))  # Rows per INSERT/transaction in /api/jobs/bulk
+app.config['JOB_BULK_BATCH_SIZE_MAX'] = int(os.getenv('JOB_BULK_BATCH_SIZE_MAX', 5000))  # Cap on ?batch_size=, which bounds the rows held in memory
+app.config['ACCOUNT_IMPORT_CHUNK_SIZE'] = int(os.getenv('ACCOUNT_IMPORT_CHUNK_SIZE', 500))
+app.config['EXPORT_BATCH_SIZE'] = int(os.getenv('EXPORT_BATCH_SIZE', 1000))  # Rows fetched per server-side cursor round-trip
+app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO')
+app.config['LOG_LEVELS'] = os.getenv('LOG_LEVELS', '')  # Per-logger overrides, e.g. 'app=WARNING,sqlalchemy.engine=INFO'
+app.config['LOG_SAMPLE_RATE'] = float(os.getenv('LOG_SAMPLE_RATE', 0.01))  # Share of high-volume success messages kept
+app.config['LOG_QUEUE_SIZE'] = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+app.config['LOCAL_STATE_DIR'] = os.getenv('LOCAL_STATE_DIR', os.path.join(tempfile.gettempdir(), 'internship_work'))  # Shared by all workers on this host
+app.config['METRICS_DIR'] = os.getenv('METRICS_DIR', os.path.join(app.config['LOCAL_STATE_DIR'], 'metrics'))
+app.config['METRICS_FLUSH_INTERVAL'] = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))  # Seconds between per-process snapshots
+app.config['SLOW_REQUEST_MS'] = float(os.getenv('SLOW_REQUEST_MS', 500))  # Requests slower than this are logged with their SQL
+app.config['PASSWORD_HASH_METHOD'] = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')  # e.g. 'scrypt:32768:8:1' or 'pbkdf2:sha256:600000'
+app.config['PASSWORD_HASH_WORKERS'] = int(os.getenv('PASSWORD_HASH_WORKERS', os.cpu_count() or 1))  # 0 hashes inline
+app.config['PASSWORD_HASH_QUEUE_SIZE'] = int(os.getenv('PASSWORD_HASH_QUEUE_SIZE', 32))
+app.config['PASSWORD_HASH_TIMEOUT'] = float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+app.config['PASSWORD_HASH_QUEUE_WAIT'] = float(os.getenv('PASSWORD_HASH_QUEUE_WAIT', 0.5))  # Wait for a free slot before answering 503
+app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+app.config['RATE_LIMIT_IP_PER_MINUTE'] = float(os.getenv('RATE_LIMIT_IP_PER_MINUTE', 30))  # Login/signup attempts per client address; 0 disables
+app.config['RATE_LIMIT_IP_BURST'] = float(os.getenv('RATE_LIMIT_IP_BURST', 20))
+app.config['RATE_LIMIT_USER_PER_MINUTE'] = float(os.getenv('RATE_LIMIT_USER_PER_MINUTE', 10))  # Attempts per username; 0 disables
+app.config['RATE_LIMIT_USER_BURST'] = float(os.getenv('RATE_LIMIT_USER_BURST', 5))
+app.config['TRUSTED_PROXIES'] = int(os.getenv('TRUSTED_PROXIES', 0))  # Reverse proxies in front of the app setting X-Forwarded-For
+app.config['PROFILE_CACHE_SIZE'] = int(os.getenv('PROFILE_CACHE_SIZE', 10000))
+app.config['PROFILE_CACHE_TTL'] = float(os.getenv('PROFILE_CACHE_TTL', 300))
+app.config['JOB_LIST_CACHE_SIZE'] = int(os.getenv('JOB_LIST_CACHE_SIZE', 1000))  # Listing pages kept per job-board version
+app.config['JOB_LIST_CACHE_TTL'] = float(os.getenv('JOB_LIST_CACHE_TTL', 300))  # Longest an entry is served; bounds staleness across hosts
+app.config['JOB_LIST_CACHE_FILL_TIMEOUT'] = float(os.getenv('JOB_LIST_CACHE_FILL_TIMEOUT', 2))  # Wait for another worker's fill
+app.config['RECOMMEND_MAX_TERMS'] = int(os.getenv('RECOMMEND_MAX_TERMS', 32))  # Terms kept per job vector
+app.config['RECOMMEND_HISTORY_SIZE'] = int(os.getenv('RECOMMEND_HISTORY_SIZE', 50))  # Recent applications that shape a student's query
+app.config['TASK_WORKERS'] = int(os.getenv('TASK_WORKERS', 2))  # Background task threads per process; 0 leaves tasks to `flask run-tasks`
+app.config['TASK_POLL_INTERVAL'] = float(os.getenv('TASK_POLL_INTERVAL', 1))  # Seconds between checks for tasks queued by other processes
+app.config['TASK_LEASE_SECONDS'] = float(os.getenv('TASK_LEASE_SECONDS', 60))  # A running task is retried after this if its worker died
+app.config['TASK_BACKOFF_BASE'] = float(os.getenv('TASK_BACKOFF_BASE', 2))  # First retry delay, doubling per attempt
+app.config['TASK_BACKOFF_MAX'] = float(os.getenv('TASK_BACKOFF_MAX', 300))
+app.config['TASK_RETENTION_SECONDS'] = float(os.getenv('TASK_RETENTION_SECONDS', 7 * 24 * 3600))  # Finished tasks and their idempotency keys
+app.config['COMPRESSION_LEVEL'] = int(os.getenv('COMPRESSION_LEVEL', 6))  # gzip, 1-9
+app.config['COMPRESSION_BROTLI_QUALITY'] = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))  # 0-11, when brotli is installed
+app.config['COMPRESSION_MIN_SIZE'] = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))  # Smaller buffered bodies are sent as they are
 
-db = SQLAlchemy(app)
+if app.config['TRUSTED_PROXIES']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
+setup_logging(app)
+logger = logging.getLogger('app')
+
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 jwt = JWTManager(app)
+password_hasher = PasswordHasher(
+    method=app.config['PASSWORD_HASH_METHOD'],
+    workers=app.config['PASSWORD_HASH_WORKERS'],
+    queue_size=app.config['PASSWORD_HASH_QUEUE_SIZE'],
+    timeout=app.config['PASSWORD_HASH_TIMEOUT'],
+    queue_wait=app.config['PASSWORD_HASH_QUEUE_WAIT']
+)
+
+# Checked before any hashing, so shed attempts cost a bucket lookup and nothing more
+rate_limiter = RateLimiter(
+    TokenBuckets(os.path.join(app.config['LOCAL_STATE_DIR'], 'rate_limits')),
+    ip_per_minute=app.config['RATE_LIMIT_IP_PER_MINUTE'],
+    ip_burst=app.config['RATE_LIMIT_IP_BURST'],
+    user_per_minute=app.config['RATE_LIMIT_USER_PER_MINUTE'],
+    user_burst=app.config['RATE_LIMIT_USER_BURST'],
+    enabled=app.config['RATE_LIMIT_ENABLED']
+)
+
+# GET/HEAD requests read from a replica unless the user wrote moments ago
+replica_router = ReplicaRouter(app, VersionTable(os.path.join(app.config['LOCAL_STATE_DIR'], 'recent_writes')))
+
+profile_cache = ProfileCache(
+    VersionTable(os.path.join(app.config['LOCAL_STATE_DIR'], 'user_versions')),
+    max_entries=app.config['PROFILE_CACHE_SIZE'],
+    ttl=app.config['PROFILE_CACHE_TTL']
+)
+
+# Version stamps behind the listing ETags: writers bump them after commit, so a
+# conditional GET is answered without touching the database
+versions = VersionTable(os.path.join(app.config['LOCAL_STATE_DIR'], 'versions'))
+JOB_BOARD = 'job_board'  # every active-job listing
+
+def applied_version_key(student_id):
+    return f'applied:{student_id}'
+
+job_list_cache = SharedResponseCache(
+    os.path.join(app.config['LOCAL_STATE_DIR'], 'job_list_cache.sqlite3'),
+    versions,
+    JOB_BOARD,
+    max_entries=app.config['JOB_LIST_CACHE_SIZE'],
+    ttl=app.config['JOB_LIST_CACHE_TTL'],
+    fill_timeout=app.config['JOB_LIST_CACHE_FILL_TIMEOUT']
+)
+
+# Per-process term vectors of active jobs; built on first use, then kept current
+# directly by this worker's writes and by a job board version check for others'
+job_matcher = JobMatcher(max_terms=app.config['RECOMMEND_MAX_TERMS'])
+
+pages = StaticPages(app)
+
+# Follow-up work queued by views after their commit; handlers are defined with the models
+task_queue = TaskQueue(
+    os.path.join(app.config['LOCAL_STATE_DIR'], 'tasks.sqlite3'),
+    workers=app.config['TASK_WORKERS'],
+    poll_interval=app.config['TASK_POLL_INTERVAL'],
+    lease_seconds=app.config['TASK_LEASE_SECONDS'],
+    backoff_base=app.config['TASK_BACKOFF_BASE'],
+    backoff_max=app.config['TASK_BACKOFF_MAX'],
+    retention_seconds=app.config['TASK_RETENTION_SECONDS']
+)
+
+metrics.init_app(app, pool_wait_stats=pool_wait_stats)
+metrics.describe('profile_cache_lookups_total', 'counter', 'Profile cache lookups by result.')
+metrics.describe('job_list_cache_lookups_total', 'counter', 'Shared job listing cache lookups by result.')
+metrics.describe('log_records_dropped_total', 'counter', 'Log records dropped because the log queue was full.')
+metrics.describe('rate_limit_rejections_total', 'counter', 'Requests refused with 429, by scope and exhausted bucket.')
+metrics.describe('password_hash_rejections_total', 'counter', 'Hashes refused with 503 because every hashing slot stayed busy.')
+metrics.add_counters(lambda: {
+    ('profile_cache_lookups_total', (('result', 'hit'),)): profile_cache.hits,
+    ('profile_cache_lookups_total', (('result', 'miss'),)): profile_cache.misses,
+    ('job_list_cache_lookups_total', (('result', 'hit'),)): job_list_cache.hits,
+    ('job_list_cache_lookups_total', (('result', 'miss'),)): job_list_cache.misses,
+    ('log_records_dropped_total', ()): log_stats().get('dropped', 0),
+    ('password_hash_rejections_total', ()): password_hasher.rejected,
+    **{('rate_limit_rejections_total', (('bucket', bucket), ('scope', scope))): count
+       for (scope, bucket), count in rate_limiter.stats().items()}
+})
+
+metrics.describe('db_reads_routed_total', 'counter', 'Read-only requests by the database that served them.')
+metrics.describe('db_replica_ejections_total', 'counter', 'Times a replica was taken out of rotation after an error.')
+metrics.add_counters(lambda: {
+    **{('db_reads_routed_total', (('target', target),)): count for target, count in replica_router.stats()[0].items()},
+    **{('db_replica_ejections_total', (('replica', key),)): count for key, count in replica_router.stats()[1].items()}
+})
+
+task_queue.init_app(app, metrics)
+metrics.describe('task_queue_wait_seconds', 'histogram', 'Time a task waited between becoming due and starting.')
+metrics.describe('task_duration_seconds', 'histogram', 'Background task run time.')
+metrics.describe('task_runs_total', 'counter', 'Background task attempts by result (success, retry, failed).')
+metrics.describe('task_queue_depth', 'gauge', 'Tasks in the queue by state.')
+metrics.describe('task_queue_oldest_ready_seconds', 'gauge', 'Age of the oldest task that is due but not started.')
+
+def task_queue_gauges():
+    counts, oldest = task_queue.depth()
+    return {
+        **{('task_queue_depth', (('state', state),)): counts.get(state, 0)
+           for state in ('queued', 'running', 'done', 'failed')},
+        ('task_queue_oldest_ready_seconds', ()): round(oldest, 3)
+    }
+
+metrics.add_gauges(task_queue_gauges)
+
+# Registered after metrics so its after_request runs first and the latency includes compression
+compression = Compression(app)
+metrics.describe('http_compression_bytes_total', 'counter', 'Response bytes before (in) and after (out) compression.')
+metrics.add_counters(lambda: {
+    ('http_compression_bytes_total', (('direction', direction), ('encoding', encoding))): value
+    for encoding, counts in compression.stats().items()
+    for direction, value in (('in', counts['bytes_in']), ('out', counts['bytes_out']))
+})
+
+def version_validators(table, key, scope=None):
+    """Return ``(etag, last_modified)`` for the current version of ``key`` in ``table``.
+
+    ``scope`` goes into the tag for per-user resources so a browser shared by
+    two accounts never revalidates one user's copy against the other's.
+    """
+    version = table.get(key)
+    etag = f'{table.epoch:x}-{version}' if scope is None else f'{table.epoch:x}-{version}-{scope}'
+    modified = table.last_modified(key)
+    # Last-Modified has one-second resolution: a stamp whose second is still
+    # running could hide a second write within it, so until that second is
+    # over the response carries only the ETag
+    if not modified or time.time() < int(modified) + 1:
+        return etag, None
+    return etag, datetime.fromtimestamp(int(modified), timezone.utc)
+
+def set_validators(response, etag, last_modified):
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    # Cacheable by the client only, and always revalidated
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+def not_modified(etag, last_modified):
+    """Return a 304 response when the client's copy is still current, else None."""
+    if request.if_none_match:
+        current = request.if_none_match.contains_weak(etag)
+    elif request.if_modified_since and last_modified:
+        current = last_modified <= request.if_modified_since
+    else:
+        current = False
+    if not current:
+        return None
+    return set_validators(Response(status=304), etag, last_modified)
+
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    return jsonify({
+        'status': 'error',
+        'message': 'Server is busy, please try again shortly'
+    }), 503, {'Retry-After': '1'}
 
 # JWT error handlers
 @jwt.expired_token_loader
 def expired_token_callback(jwt_header, jwt_payload):
-    print("Token expired")
+    logger.info("Token expired", extra={'sample': True})
     return jsonify({
         'status': 'error',
         'message': 'Token has expired'
@@ -33,7 +272,7 @@ def expired_token_callback(jwt_header, jwt_payload):
 
 @jwt.invalid_token_loader
 def invalid_token_callback(error):
-    print(f"Invalid token: {error}")
+    logger.warning("Invalid token", extra={'error': error})
     return jsonify({
         'status': 'error',
         'message': 'Invalid token'
@@ -41,7 +280,7 @@ def invalid_token_callback(error):
 
 @jwt.unauthorized_loader
 def unauthorized_callback(error):
-    print(f"Missing token: {error}")
+    logger.info("Missing token", extra={'error': error, 'sample': True})
     return jsonify({
         'status': 'error',
         'message': 'Authorization header missing'
@@ -50,13 +289,16 @@ def unauthorized_callback(error):
 # User Model
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    password_hash = db.Column(db.String(120), nullable=False)
-    user_type = db.Column(db.String(20), nullable=False)  # 'student', 'employer', 'tpo', 'super_admin'
+    username = db.Column(db.String(80), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    # Case-insensitive uniqueness lives on these; they are kept in sync by the validators below
+    username_normalized = db.Column(db.String(80), nullable=False)
+    email_normalized = db.Column(db.String(120), nullable=False)
+    password_hash = db.Column(db.String(255), nullable=False)
+    user_type = db.Column(db.String(20), nullable=False, index=True)  # 'student', 'employer', 'tpo', 'super_admin'
     first_name = db.Column(db.String(50))
     last_name = db.Column(db.String(50))
-    institute = db.Column(db.String(100))  # For TPOs
+    institute = db.Column(db.String(100), index=True)  # For TPOs and imported students
     department = db.Column(db.String(100))  # For TPOs
     company_name = db.Column(db.String(100))  # For employers
     company_website = db.Column(db.String(200))  # For employers
@@ -66,11 +308,34 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     created_by = db.Column(db.Integer, db.ForeignKey('user.id'))  # For TPOs, tracks who created them
 
+    creator = db.relationship('User', remote_side=[id])
+    jobs = db.relationship('Job', back_populates='employer')  # For employers
+    applications = db.relationship('JobApplication', back_populates='student')  # For students
+
+    __table_args__ = (
+        db.UniqueConstraint('username_normalized', name='uq_user_username_normalized'),
+        db.UniqueConstraint('email_normalized', name='uq_user_email_normalized'),
+    )
+
+    @staticmethod
+    def normalize(value):
+        return value.strip().lower() if value else value
+
+    @validates('username')
+    def validate_username(self, key, username):
+        self.username_normalized = User.normalize(username)
+        return username
+
+    @validates('email')
+    def validate_email(self, key, email):
+        self.email_normalized = User.normalize(email)
+        return email
+
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return password_hasher.verify(self.password_hash, password)
 
 # Job Model
 class Job(db.Model):
@@ -78,10 +343,20 @@ class Job(db.Model):
     company = db.Column(db.String(100), nullable=False)
     position = db.Column(db.String(100), nullable=False)
     requirements = db.Column(db.Text, nullable=False)
-    employer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    employer_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='active')  # 'active' or 'closed'
 
+    employer = db.relationship('User', back_populates='jobs')
+    applications = db.relationship('JobApplication', back_populates='job')
+
+    # Serves the job board listing: equality on status, then keyset walk on (created_at, id)
+    __table_args__ = (
+        db.Index('ix_job_status_created_at_id', 'status', 'created_at', 'id'),
+    )
+
+install_job_search(Job.__table__)
+
 # Job Application Model
 class JobApplication(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -90,68 +365,150 @@ class JobApplication(db.Model):
     status = db.Column(db.String(20), default='pending')  # 'pending', 'accepted', 'rejected'
     date_applied = db.Column(db.DateTime, default=datetime.utcnow)
 
-# Frontend Routes
+    job = db.relationship('Job', back_populates='applications')
+    student = db.relationship('User', back_populates='applications')
+
+    __table_args__ = (
+        # One application per student per job, enforced by the database
+        db.UniqueConstraint('job_id', 'student_id', name='uq_job_application_job_student'),
+        # Serves a student's application history, newest first
+        db.Index('ix_job_application_student_date', 'student_id', 'date_applied'),
+    )
+
+# In-app messages written by background tasks; ``key`` makes a replayed task a no-op
+class Notification(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    key = db.Column(db.String(120), unique=True)
+    message = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        # Serves a user's notifications, newest first
+        db.Index('ix_notification_user_created_at', 'user_id', 'created_at'),
+    )
+
+# Counts for the /api/stats endpoints, kept current by triggers on the tables above
+stats_tables = install_rollups(db.metadata)
+APPLICATION_STATUSES = ['pending', 'accepted', 'rejected']
+
+# Frontend Routes: rendered once at startup and served as precompressed bytes
 @app.route('/')
 def index():
-    return render_template('index.html')
+    return pages.serve('index.html')
 
 @app.route('/login')
 def login_page():
-    return render_template('login.html')
+    return pages.serve('login.html')
 
 @app.route('/register')
 def register_page():
-    return render_template('register.html')
+    return pages.serve('register.html')
 
 @app.route('/register/student')
 def register_student_page():
-    return render_template('register_student.html')
+    return pages.serve('register_student.html')
 
 @app.route('/register/employee')
 def register_employee_page():
-    return render_template('register_employee.html')
+    return pages.serve('register_employee.html')
 
 @app.route('/register/tpo')
 def register_tpo_page():
-    return render_template('register_tpo.html')
+    return pages.serve('register_tpo.html')
 
 @app.route('/dashboard')
 def dashboard():
-    # This route just renders the dashboard template
-    # No authentication required here
-    return render_template('dashboard.html')
+    # Static page; authentication happens in its scripts
+    return pages.serve('dashboard.html')
 
 @app.route('/dashboard/student')
 def student_dashboard_page():
-    return render_template('student_dashboard.html')
+    return pages.serve('student_dashboard.html')
 
 @app.route('/dashboard/employee')
 def employee_dashboard_page():
-    return render_template('employee_dashboard.html')
+    return pages.serve('employee_dashboard.html')
 
 @app.route('/dashboard/tpo')
 def tpo_dashboard_page():
-    return render_template('tpo_dashboard.html')
+    return pages.serve('tpo_dashboard.html')
 
 @app.route('/dashboard/super-admin')
 def super_admin_dashboard_page():
-    return render_template('super_admin_dashboard.html')
+    return pages.serve('super_admin_dashboard.html')
 
 @app.route('/reset-password')
 def reset_password_page():
-    return render_template('reset_password.html')
+    return pages.serve('reset_password.html')
+
+# Registration helpers
+def duplicate_account_message(error):
+    """Map a unique-constraint violation on user back to a user-facing message."""
+    message = str(error.orig)
+    # Only look at the part naming the violated key, never at the duplicate value itself
+    violated = re.split(r"for key|constraint failed:|unique constraint", message)[-1]
+    if 'email_normalized' in violated:
+        return 'Email already exists'
+    if 'username_normalized' in violated:
+        return 'Username already exists'
+    return None
+
+def register_account(data, user_type, **fields):
+    """Create a user with one INSERT, leaving uniqueness to the database.
+
+    Shared by every registration path. Returns ``(user, None)`` on success or
+    ``(None, message)`` when input is missing or the username/email is taken.
+    """
+    username = data.get('username')
+    email = data.get('email')
+    password = data.get('password')
+    if not username or not email or not password:
+        return None, 'Username, email and password are required'
+    
+    user = User(
+        username=username,
+        email=email,
+        user_type=user_type,
+        first_name=data.get('first_name'),
+        last_name=data.get('last_name'),
+        **fields
+    )
+    user.set_password(password)
+    
+    db.session.add(user)
+    try:
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        message = duplicate_account_message(e)
+        if message is None:
+            raise
+        return None, message
+    replica_router.note_write(user.id)
+    return user, None
 
 # API Routes
+@app.route('/api/health', methods=['GET'])
+def health():
+    healthy, report = database_health(db.engine)
+    report['status'] = 'ok' if healthy else 'error'
+    report['pid'] = os.getpid()
+    if replica_router.keys:
+        report['replicas'] = replica_router.status()
+    return jsonify(report), 200 if healthy else 503
+
 @app.route('/api/login', methods=['POST'])
+@rate_limiter.limit('login')
 def login():
     data = request.get_json()
     username = data.get('username')
     password = data.get('password')
     user_type = data.get('user_type')
     
-    print(f"Login attempt: username={username}, user_type={user_type}")
+    logger.info("Login attempt", extra={'username': username, 'user_type': user_type, 'sample': True})
     
-    user = User.query.filter_by(username=username, user_type=user_type).first()
+    user = User.query.filter_by(username_normalized=User.normalize(username), user_type=user_type).first()
     
     if user and user.check_password(password):
         if not user.is_active:
@@ -167,6 +524,11 @@ def login():
                 'requires_reset': True
             }), 403
         
+        # Upgrade hashes made with outdated parameters while we have the plaintext
+        if password_hasher.needs_rehash(user.password_hash):
+            user.set_password(password)
+            db.session.commit()
+        
         # Create JWT token
         access_token = create_access_token(identity={
             'user_id': user.id,
@@ -174,7 +536,7 @@ def login():
             'user_type': user.user_type
         })
         
-        print(f"Login successful: username={username}, user_type={user_type}")
+        logger.info("Login successful", extra={'username': username, 'user_type': user_type, 'sample': True})
         
         return jsonify({
             'status': 'success',
@@ -189,21 +551,17 @@ def login():
             }
         }), 200
     else:
-        print(f"Login failed: username={username}, user_type={user_type}")
+        logger.warning("Login failed", extra={'username': username, 'user_type': user_type})
         return jsonify({
             'status': 'error',
             'message': 'Invalid username, password, or user type'
         }), 401
 
 @app.route('/api/register', methods=['POST'])
+@rate_limiter.limit('register')
 def register():
     data = request.get_json()
-    username = data.get('username')
-    email = data.get('email')
-    password = data.get('password')
     user_type = data.get('user_type')
-    first_name = data.get('first_name')
-    last_name = data.get('last_name')
     
     # Only allow student and employer registration
     if user_type not in ['student', 'employer']:
@@ -212,30 +570,13 @@ def register():
             'message': 'Invalid user type for registration'
         }), 400
     
-    if User.query.filter_by(username=username).first():
-        return jsonify({
-            'status': 'error',
-            'message': 'Username already exists'
-        }), 400
-    
-    if User.query.filter_by(email=email).first():
+    user, error = register_account(data, user_type)
+    if error:
         return jsonify({
             'status': 'error',
-            'message': 'Email already exists'
+            'message': error
         }), 400
     
-    user = User(
-        username=username,
-        email=email,
-        user_type=user_type,
-        first_name=first_name,
-        last_name=last_name
-    )
-    user.set_password(password)
-    
-    db.session.add(user)
-    db.session.commit()
-    
     return jsonify({
         'status': 'success',
         'message': 'Registration successful'
@@ -246,29 +587,27 @@ def register():
 def get_profile():
     try:
         current_user = get_jwt_identity()
-        print(f"Profile request for user: {current_user}")
+        logger.debug("Profile request", extra={'identity': current_user})
         
         if not current_user or 'user_id' not in current_user:
-            print("Invalid JWT payload")
+            logger.warning("Invalid JWT payload", extra={'identity': current_user})
             return jsonify({
                 'status': 'error',
                 'message': 'Invalid authentication token'
             }), 401
         
-        user = User.query.get(current_user['user_id'])
+        etag, modified = version_validators(profile_cache.versions, current_user['user_id'],
+                                            scope=current_user['user_id'])
+        cached = not_modified(etag, modified)
+        if cached:
+            return cached
         
-        if not user:
-            print(f"User not found: {current_user['user_id']}")
-            return jsonify({
-                'status': 'error',
-                'message': 'User not found'
-            }), 404
-        
-        print(f"Profile found for: {user.username}, type: {user.user_type}")
-        
-        return jsonify({
-            'status': 'success',
-            'user': {
+        def load_profile():
+            with replica_router.settled(profile_cache.versions.last_modified(current_user['user_id'])):
+                user = db.session.get(User, current_user['user_id'])
+            if not user:
+                return None
+            return {
                 'id': user.id,
                 'username': user.username,
                 'user_type': user.user_type,
@@ -278,9 +617,24 @@ def get_profile():
                 'company_name': user.company_name if user.user_type == 'employer' else None,
                 'company_website': user.company_website if user.user_type == 'employer' else None
             }
-        }), 200
-    except Exception as e:
-        print(f"Error in profile endpoint: {str(e)}")
+        
+        profile = profile_cache.get_or_load(current_user['user_id'], load_profile)
+        
+        if not profile:
+            logger.warning("User not found", extra={'user_id': current_user['user_id']})
+            return jsonify({
+                'status': 'error',
+                'message': 'User not found'
+            }), 404
+        
+        logger.info("Profile served", extra={'username': profile['username'], 'user_type': profile['user_type'], 'sample': True})
+        
+        return set_validators(jsonify({
+            'status': 'success',
+            'user': profile
+        }), etag, modified), 200
+    except Exception:
+        logger.exception("Error in profile endpoint")
         return jsonify({
             'status': 'error',
             'message': 'Internal server error'
@@ -319,13 +673,7 @@ def update_profile():
         if 'last_name' in data:
             user.last_name = data['last_name']
         if 'email' in data:
-            # Check if email is already in use by another user
-            existing_user = User.query.filter_by(email=data['email']).first()
-            if existing_user and existing_user.id != user.id:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Email already in use'
-                }), 400
+            # Uniqueness is checked by the email_normalized constraint on commit
             user.email = data['email']
         
         # Update employer-specific fields
@@ -342,7 +690,17 @@ def update_profile():
             if 'department' in data:
                 user.department = data['department']
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError as e:
+            db.session.rollback()
+            if duplicate_account_message(e) != 'Email already exists':
+                raise
+            return jsonify({
+                'status': 'error',
+                'message': 'Email already in use'
+            }), 400
+        profile_cache.invalidate(user.id)
         
         return jsonify({
             'status': 'success',
@@ -361,7 +719,7 @@ def update_profile():
             }
         }), 200
     except Exception as e:
-        print(f"Error in update profile endpoint: {str(e)}")
+        logger.exception("Error in update profile endpoint")
         return jsonify({
             'status': 'error',
             'message': f'Internal server error: {str(e)}'
@@ -388,6 +746,7 @@ def create_job():
     
     db.session.add(job)
     db.session.commit()
+    job_matcher.add(job.id, job.position, job.requirements, version=versions.bump(JOB_BOARD))
     
     return jsonify({
         'status': 'success',
@@ -395,20 +754,313 @@ def create_job():
         'job_id': job.id
     }), 201
 
+def validate_job_posting(record):
+    """Return ``(values, error)`` for one bulk posting; exactly one of them is None."""
+    if isinstance(record, RecordError):
+        return None, str(record)
+    if not isinstance(record, dict):
+        return None, 'Posting must be a JSON object'
+
+    values = {}
+    for field, max_length in (('company', 100), ('position', 100), ('requirements', None)):
+        value = record.get(field)
+        if not isinstance(value, str) or not value.strip():
+            return None, f'{field} is required'
+        if max_length and len(value) > max_length:
+            return None, f'{field} must be at most {max_length} characters'
+        values[field] = value
+    return values, None
+
+@app.route('/api/jobs/bulk', methods=['POST'])
+@jwt_required()
+def create_jobs_bulk():
+    current_user = get_jwt_identity()
+    if current_user['user_type'] != 'employer':
+        return jsonify({
+            'status': 'error',
+            'message': 'Only employers can create jobs'
+        }), 403
+
+    employer_id = current_user['user_id']
+    batch_size = max(1, min(request.args.get('batch_size', app.config['JOB_BULK_BATCH_SIZE'], type=int),
+                            app.config['JOB_BULK_BATCH_SIZE_MAX']))
+
+    # Postings are read, validated and inserted one batch at a time while the
+    # per-row results stream back, so memory stays flat for any payload size
+    def generate():
+        created = rejected = 0
+        for batch in batched(enumerate(iter_records(request.stream), 1), batch_size):
+            rows = []
+            results = []
+            for row_number, record in batch:
+                values, error = validate_job_posting(record)
+                if error:
+                    results.append({'row': row_number, 'status': 'error', 'message': error})
+                else:
+                    values['employer_id'] = employer_id
+                    rows.append(values)
+                    results.append({'row': row_number, 'status': 'created'})
+
+            if rows:
+                try:
+                    db.session.execute(insert(Job), rows)
+                    db.session.commit()
+                    versions.bump(JOB_BOARD)
+                except SQLAlchemyError:
+                    db.session.rollback()
+                    logger.exception("Bulk job insert failed", extra={'employer_id': employer_id})
+                    for result in results:
+                        if result['status'] == 'created':
+                            result.update(status='error', message='Database error, batch rolled back')
+
+            for result in results:
+                if result['status'] == 'created':
+                    created += 1
+                else:
+                    rejected += 1
+            yield ''.join(json.dumps(result) + '\n' for result in results)
+
+        yield json.dumps({'status': 'success', 'created': created, 'rejected': rejected}) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def encode_job_cursor(created_at, job_id):
+    raw = f"{created_at.isoformat()}|{job_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_job_cursor(cursor):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    created_at, job_id = base64.urlsafe_b64decode(padded).decode().split('|')
+    return datetime.fromisoformat(created_at), int(job_id)
+
+def escape_like(value):
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
 @app.route('/api/jobs/available', methods=['GET'])
 @jwt_required()
 def get_available_jobs():
-    jobs = Job.query.filter_by(status='active').all()
+    try:
+        limit = int(request.args.get('limit', app.config['JOBS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({
+            'status': 'error',
+            'message': 'limit must be an integer'
+        }), 400
+    limit = max(1, min(limit, app.config['JOBS_PAGE_SIZE_MAX']))
+
+    etag, modified = version_validators(versions, JOB_BOARD)
+    cached = not_modified(etag, modified)
+    if cached:
+        return cached
+
+    after = request.args.get('after')
+    company = request.args.get('company')
+    position = request.args.get('position')
+    include = set(filter(None, request.args.get('include', '').split(',')))
+    with_requirements = 'requirements' in include
+
+    if after:
+        try:
+            after_created_at, after_id = decode_job_cursor(after)
+        except (ValueError, UnicodeDecodeError):
+            return jsonify({
+                'status': 'error',
+                'message': 'Invalid cursor'
+            }), 400
+
+    def render_page():
+        # Slim projection by default; the requirements Text column is only read on request
+        columns = [Job.id, Job.company, Job.position, Job.created_at]
+        if with_requirements:
+            columns.append(Job.requirements)
+
+        query = db.session.query(*columns).filter(Job.status == 'active')
+        if company:
+            query = query.filter(Job.company.ilike(f"%{escape_like(company)}%", escape='\\'))
+        if position:
+            query = query.filter(Job.position.ilike(f"%{escape_like(position)}%", escape='\\'))
+        if after:
+            # Expanded row comparison so MySQL and SQLite both turn it into an index range
+            query = query.filter(or_(
+                Job.created_at < after_created_at,
+                and_(Job.created_at == after_created_at, Job.id < after_id)
+            ))
+
+        # Fetch one extra row to know whether another page exists without a COUNT(*)
+        # Stored under the current job board version, so not read from a replica that may lag it
+        with replica_router.settled(versions.last_modified(JOB_BOARD)):
+            rows = query.order_by(Job.created_at.desc(), Job.id.desc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Rows go to the JSON provider as they are, keyed by column name
+        return jsonify({
+            'status': 'success',
+            'jobs': rows,
+            'next_cursor': encode_job_cursor(rows[-1].created_at, rows[-1].id) if has_more else None,
+            'has_more': has_more
+        }).get_data()
+
+    # Every student sees the same pages, so the serialized bytes are shared by all workers
+    page_key = json.dumps([limit, after, company, position, with_requirements])
+    body = job_list_cache.get_or_fill(page_key, render_page)
+    return set_validators(app.response_class(body, mimetype=app.json.mimetype), etag, modified), 200
+
+@app.route('/api/jobs/search', methods=['GET'])
+@jwt_required()
+def search_available_jobs():
+    q = request.args.get('q', '').strip()
+    if not q:
+        return jsonify({
+            'status': 'error',
+            'message': 'Search query is required'
+        }), 400
+
+    try:
+        limit = int(request.args.get('limit', app.config['JOBS_PAGE_SIZE']))
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({
+            'status': 'error',
+            'message': 'limit and offset must be integers'
+        }), 400
+    limit = max(1, min(limit, app.config['JOBS_PAGE_SIZE_MAX']))
+    offset = max(0, offset)
+
+    rows = search_jobs(db.session, q, limit + 1, offset)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
     return jsonify({
         'status': 'success',
+        'jobs': [{
+            'id': row.id,
+            'company': row.company,
+            'position': row.position,
+            'created_at': row.created_at.isoformat(),
+            'score': float(row.score)
+        } for row in rows],
+        'next_offset': offset + limit if has_more else None,
+        'has_more': has_more
+    }), 200
+
+def synced_job_matcher():
+    """Return ``job_matcher`` after catching up with job board writes from other workers."""
+    def load_active_ids():
+        return db.session.scalars(select(Job.id).where(Job.status == 'active'))
+
+    def load_texts(job_ids):
+        for chunk in batched(job_ids, 500):
+            yield from db.session.query(Job.id, Job.position, Job.requirements).filter(Job.id.in_(chunk))
+
+    # Marked current at this version, so the ids must not come from a replica that may lag it
+    with replica_router.settled(versions.last_modified(JOB_BOARD)):
+        job_matcher.sync(versions.get(JOB_BOARD), load_active_ids, load_texts, generation=versions.epoch)
+    return job_matcher
+
+@app.route('/api/jobs/recommended', methods=['GET'])
+@jwt_required()
+def get_recommended_jobs():
+    current_user = get_jwt_identity()
+    if current_user['user_type'] != 'student':
+        return jsonify({
+            'status': 'error',
+            'message': 'Only students can view recommended jobs'
+        }), 403
+
+    try:
+        limit = int(request.args.get('limit', app.config['JOBS_PAGE_SIZE']))
+    except ValueError:
+        return jsonify({
+            'status': 'error',
+            'message': 'limit must be an integer'
+        }), 400
+    limit = max(1, min(limit, app.config['JOBS_PAGE_SIZE_MAX']))
+
+    matcher = synced_job_matcher()
+    student_id = current_user['user_id']
+    # The query is the student's recent applications (accepted ones count
+    # double) plus their department, if the profile has one; only those
+    # rows carry the requirements text, the rest just need excluding
+    recent = db.session.query(
+        Job.position, Job.requirements, JobApplication.status
+    ).join(JobApplication.job).filter(
+        JobApplication.student_id == student_id
+    ).order_by(JobApplication.date_applied.desc()).limit(app.config['RECOMMEND_HISTORY_SIZE']).all()
+    applied = db.session.scalars(select(JobApplication.job_id).where(JobApplication.student_id == student_id)).all()
+    documents = [(application.position, application.requirements) for application in recent]
+    weights = [2.0 if application.status == 'accepted' else 1.0 for application in recent]
+    department = db.session.query(User.department).filter(User.id == student_id).scalar()
+    if department:
+        documents.append((department, ''))
+        weights.append(1.0)
+
+    ranked = matcher.top(matcher.query_vector(documents, weights), limit, exclude=applied)
+    scores = dict(ranked)
+    # Status is checked here rather than in SQL: with it in the WHERE clause
+    # SQLite prefers the status index and walks every active job
+    jobs = db.session.query(Job.id, Job.company, Job.position, Job.created_at, Job.status).filter(
+        Job.id.in_(scores)).all() if scores else []
+    jobs = sorted((job for job in jobs if job.status == 'active'), key=lambda job: -scores[job.id])
+    personalized = bool(jobs)
+
+    # Without any signal yet, fall back to the newest openings
+    if not personalized:
+        jobs = db.session.query(Job.id, Job.company, Job.position, Job.created_at).filter(
+            Job.status == 'active',
+            Job.id.not_in(select(JobApplication.job_id).where(JobApplication.student_id == student_id))
+        ).order_by(Job.created_at.desc(), Job.id.desc()).limit(limit).all()
+
+    return jsonify({
+        'status': 'success',
+        'personalized': personalized,
         'jobs': [{
             'id': job.id,
             'company': job.company,
             'position': job.position,
-            'requirements': job.requirements
+            'created_at': job.created_at,
+            'score': round(scores.get(job.id, 0.0), 4)
         } for job in jobs]
     }), 200
 
+@app.route('/api/jobs/<int:job_id>/status', methods=['PUT'])
+@jwt_required()
+def update_job_status(job_id):
+    current_user = get_jwt_identity()
+    if current_user['user_type'] != 'employer':
+        return jsonify({
+            'status': 'error',
+            'message': 'Only employers can change job status'
+        }), 403
+
+    job = Job.query.get_or_404(job_id)
+    if job.employer_id != current_user['user_id']:
+        return jsonify({
+            'status': 'error',
+            'message': 'You can only change the status of your own jobs'
+        }), 403
+
+    data = request.get_json()
+    status = data.get('status') if data else None
+    if status not in ['active', 'closed']:
+        return jsonify({
+            'status': 'error',
+            'message': "Status must be 'active' or 'closed'"
+        }), 400
+
+    job.status = status
+    db.session.commit()
+    version = versions.bump(JOB_BOARD)
+    if status == 'active':
+        job_matcher.add(job.id, job.position, job.requirements, version=version)
+    else:
+        job_matcher.remove(job.id, version=version)
+
+    return jsonify({
+        'status': 'success',
+        'message': 'Job status updated successfully'
+    }), 200
+
 @app.route('/api/jobs/applied', methods=['GET'])
 @jwt_required()
 def get_applied_jobs():
@@ -419,19 +1071,49 @@ def get_applied_jobs():
             'message': 'Only students can view applied jobs'
         }), 403
     
-    applications = JobApplication.query.filter_by(student_id=current_user['user_id']).all()
-    return jsonify({
+    etag, modified = version_validators(versions, applied_version_key(current_user['user_id']),
+                                        scope=current_user['user_id'])
+    cached = not_modified(etag, modified)
+    if cached:
+        return cached
+    
+    # One joined query projecting only the listed columns instead of a lazy load per application.
+    # Only the student's own applies move this ETag, and read-your-writes keeps those on the primary
+    applications = db.session.query(
+        JobApplication.id,
+        JobApplication.status,
+        JobApplication.date_applied,
+        Job.id.label('job_id'),
+        Job.company,
+        Job.position
+    ).join(JobApplication.job).filter(
+        JobApplication.student_id == current_user['user_id']
+    ).order_by(JobApplication.date_applied.desc()).all()
+
+    return set_validators(jsonify({
         'status': 'success',
         'applications': [{
-            'id': app.id,
+            'id': application.id,
             'job': {
-                'company': app.job.company,
-                'position': app.job.position
+                'id': application.job_id,
+                'company': application.company,
+                'position': application.position
             },
-            'status': app.status,
-            'date_applied': app.date_applied.isoformat()
-        } for app in applications]
-    }), 200
+            'status': application.status,
+            'date_applied': application.date_applied
+        } for application in applications]
+    }), etag, modified), 200
+
+def insert_ignoring_duplicates(table):
+    """INSERT that skips rows violating a unique key instead of raising."""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'mysql':
+        return mysql.insert(table).prefix_with('IGNORE')
+    if dialect == 'sqlite':
+        return sqlite.insert(table).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        return postgresql.insert(table).on_conflict_do_nothing()
+    raise NotImplementedError(f"Conditional insert is not supported on {dialect}")
 
 @app.route('/api/jobs/<int:job_id>/apply', methods=['POST'])
 @jwt_required()
@@ -443,91 +1125,263 @@ def apply_for_job(job_id):
             'message': 'Only students can apply for jobs'
         }), 403
     
-    job = Job.query.get_or_404(job_id)
-    if job.status != 'active':
+    # A single conditional INSERT: the SELECT only yields a row while the job
+    # is active and the unique constraint turns a repeat into a no-op, so
+    # concurrent double-submits cannot create duplicates
+    candidate = select(
+        literal(job_id),
+        literal(current_user['user_id']),
+        literal('pending'),
+        literal(datetime.utcnow(), db.DateTime)
+    ).where(Job.id == job_id, Job.status == 'active')
+    statement = insert_ignoring_duplicates(JobApplication.__table__).from_select(
+        ['job_id', 'student_id', 'status', 'date_applied'], candidate
+    )
+    
+    result = db.session.execute(statement)
+    db.session.commit()
+    
+    if result.rowcount == 1:
+        versions.bump(applied_version_key(current_user['user_id']))
+        enqueue_task('notify_employer_of_application',
+                     {'job_id': job_id, 'student_id': current_user['user_id']},
+                     key=f"application:{job_id}:{current_user['user_id']}")
+        return jsonify({
+            'status': 'success',
+            'message': 'Application submitted successfully'
+        }), 201
+    
+    # Nothing was inserted; only now look up why
+    job_status = db.session.query(Job.status).filter(Job.id == job_id).scalar()
+    if job_status is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job not found'
+        }), 404
+    if job_status != 'active':
         return jsonify({
             'status': 'error',
             'message': 'This job is no longer accepting applications'
         }), 400
-    
-    # Check if already applied
-    existing_application = JobApplication.query.filter_by(
-        job_id=job_id,
-        student_id=current_user['user_id']
-    ).first()
-    
-    if existing_application:
+    return jsonify({
+        'status': 'error',
+        'message': 'You have already applied for this job'
+    }), 400
+
+# Background tasks: queued after the request's commit, run by task_queue workers
+def enqueue_task(name, payload, key):
+    """Queue follow-up work; the request's own write is already committed, so a queue error is only logged."""
+    try:
+        task_queue.enqueue(name, payload, key=key)
+    except Exception:
+        logger.exception("Could not queue task", extra={'task': name, 'key': key})
+
+def add_notification(user_id, message, key):
+    db.session.execute(insert_ignoring_duplicates(Notification.__table__).values(
+        user_id=user_id, message=message, key=key, created_at=datetime.utcnow()))
+    db.session.commit()
+
+@task_queue.task('notify_employer_of_application')
+def notify_employer_of_application(payload):
+    job = db.session.get(Job, payload['job_id'])
+    student = db.session.get(User, payload['student_id'])
+    if job is None or student is None:
+        return
+    name = ' '.join(filter(None, [student.first_name, student.last_name])) or student.username
+    add_notification(job.employer_id, f"{name} applied for {job.position} at {job.company}",
+                     key=f"application:{job.id}:{student.id}")
+
+@task_queue.task('send_tpo_welcome')
+def send_tpo_welcome(payload):
+    tpo = db.session.get(User, payload['tpo_id'])
+    if tpo is None:
+        return
+    add_notification(tpo.id, f"Welcome, {tpo.first_name or tpo.username}! Your TPO account for "
+                             f"{tpo.institute or 'your institute'} is ready. Please set a new password.",
+                     key=f'tpo-welcome:{tpo.id}')
+
+@app.route('/api/notifications', methods=['GET'])
+@jwt_required()
+def get_notifications():
+    current_user = get_jwt_identity()
+    limit, error = int_arg('limit', 20, 100)
+    if error:
+        return error
+    notifications = Notification.query.filter_by(user_id=current_user['user_id']) \
+        .order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit).all()
+    return jsonify({
+        'status': 'success',
+        'notifications': [{
+            'id': notification.id,
+            'message': notification.message,
+            'created_at': notification.created_at
+        } for notification in notifications]
+    }), 200
+
+# Application export routes
+APPLICATION_EXPORT_COLUMNS = [
+    'application_id', 'job_id', 'company', 'position', 'student_id', 'student_username',
+    'student_email', 'student_first_name', 'student_last_name', 'institute', 'status', 'date_applied'
+]
+
+def application_export_response(criteria, filename):
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
         return jsonify({
             'status': 'error',
-            'message': 'You have already applied for this job'
+            'message': f"format must be one of {', '.join(EXPORT_FORMATS)}"
         }), 400
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
     
-    application = JobApplication(
-        job_id=job_id,
-        student_id=current_user['user_id']
-    )
+    statement = select(
+        JobApplication.id,
+        Job.id,
+        Job.company,
+        Job.position,
+        User.id,
+        User.username,
+        User.email,
+        User.first_name,
+        User.last_name,
+        User.institute,
+        JobApplication.status,
+        JobApplication.date_applied
+    ).select_from(JobApplication).join(Job, JobApplication.job_id == Job.id).join(
+        User, JobApplication.student_id == User.id
+    ).where(*criteria).order_by(JobApplication.id)
     
-    db.session.add(application)
-    db.session.commit()
+    chunks, mimetype = export_stream(db.session, statement, APPLICATION_EXPORT_COLUMNS, fmt,
+                                     compress=compress, batch_size=app.config['EXPORT_BATCH_SIZE'])
+    filename = f"{filename}.{fmt}" + ('.gz' if compress else '')
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename="{filename}"'
+    })
+
+@app.route('/api/jobs/<int:job_id>/applications/export', methods=['GET'])
+@jwt_required()
+def export_job_applications(job_id):
+    current_user = get_jwt_identity()
+    if current_user['user_type'] not in ['employer', 'super_admin']:
+        return jsonify({
+            'status': 'error',
+            'message': 'Only employers can export job applications'
+        }), 403
     
-    return jsonify({
-        'status': 'success',
-        'message': 'Application submitted successfully'
-    }), 201
+    job = Job.query.get_or_404(job_id)
+    if current_user['user_type'] == 'employer' and job.employer_id != current_user['user_id']:
+        return jsonify({
+            'status': 'error',
+            'message': 'You can only export applications for your own jobs'
+        }), 403
+    
+    return application_export_response([JobApplication.job_id == job_id], f'applications-job-{job_id}')
 
-# Super Admin Routes
-@app.route('/api/admin/create-tpo', methods=['POST'])
+@app.route('/api/employer/applications/export', methods=['GET'])
 @jwt_required()
-def create_tpo():
+def export_employer_applications():
     current_user = get_jwt_identity()
-    if current_user['user_type'] != 'super_admin':
+    if current_user['user_type'] == 'employer':
+        employer_id = current_user['user_id']
+    elif current_user['user_type'] == 'super_admin' and request.args.get('employer_id', type=int):
+        employer_id = request.args.get('employer_id', type=int)
+    else:
         return jsonify({
             'status': 'error',
-            'message': 'Only super admin can create TPO accounts'
+            'message': 'Only employers can export their applications'
         }), 403
     
-    data = request.get_json()
-    username = data.get('username')
-    email = data.get('email')
-    password = data.get('password')
-    first_name = data.get('first_name')
-    last_name = data.get('last_name')
-    institute = data.get('institute')
-    department = data.get('department')
+    return application_export_response([Job.employer_id == employer_id], f'applications-employer-{employer_id}')
+
+@app.route('/api/tpo/applications/export', methods=['GET'])
+@jwt_required()
+def export_institute_applications():
+    current_user = get_jwt_identity()
+    if current_user['user_type'] == 'tpo':
+        institute = db.session.get(User, current_user['user_id']).institute
+    elif current_user['user_type'] == 'super_admin':
+        institute = request.args.get('institute')
+    else:
+        return jsonify({
+            'status': 'error',
+            'message': 'Only TPOs can export institute applications'
+        }), 403
     
-    if User.query.filter_by(username=username).first():
+    if not institute:
         return jsonify({
             'status': 'error',
-            'message': 'Username already exists'
+            'message': 'Institute is required'
         }), 400
     
-    if User.query.filter_by(email=email).first():
+    slug = ''.join(ch if ch.isalnum() else '-' for ch in institute.lower())
+    return application_export_response([User.institute == institute], f'applications-{slug}')
+
+# Super Admin Routes
+@app.route('/api/admin/create-tpo', methods=['POST'])
+@jwt_required()
+def create_tpo():
+    current_user = get_jwt_identity()
+    if current_user['user_type'] != 'super_admin':
         return jsonify({
             'status': 'error',
-            'message': 'Email already exists'
-        }), 400
+            'message': 'Only super admin can create TPO accounts'
+        }), 403
     
-    tpo = User(
-        username=username,
-        email=email,
-        user_type='tpo',
-        first_name=first_name,
-        last_name=last_name,
-        institute=institute,
-        department=department,
+    data = request.get_json()
+    tpo, error = register_account(
+        data,
+        'tpo',
+        institute=data.get('institute'),
+        department=data.get('department'),
         created_by=current_user['user_id'],
         requires_password_reset=True
     )
-    tpo.set_password(password)
-    
-    db.session.add(tpo)
-    db.session.commit()
+    if error:
+        return jsonify({
+            'status': 'error',
+            'message': error
+        }), 400
+    enqueue_task('send_tpo_welcome', {'tpo_id': tpo.id}, key=f'tpo-welcome:{tpo.id}')
     
     return jsonify({
         'status': 'success',
         'message': 'TPO account created successfully'
     }), 201
 
+@app.route('/api/admin/import-accounts', methods=['POST'])
+@jwt_required()
+def import_accounts_csv():
+    current_user = get_jwt_identity()
+    if current_user['user_type'] != 'super_admin':
+        return jsonify({
+            'status': 'error',
+            'message': 'Only super admin can import accounts'
+        }), 403
+    
+    # Accept either a multipart upload named "file" or a raw text/csv body
+    upload = request.files.get('file')
+    source = upload.stream if upload else request.stream
+    rows = csv.DictReader(io.TextIOWrapper(source, encoding='utf-8-sig', newline=''))
+    
+    # The report is spooled to a temp file so memory stays flat for large imports
+    report_file = tempfile.TemporaryFile()
+    report_text = io.TextIOWrapper(report_file, encoding='utf-8', newline='')
+    report = csv.DictWriter(report_text, fieldnames=REPORT_FIELDS)
+    report.writeheader()
+    
+    stats = import_accounts(db.session, User, password_hasher, rows, report,
+                            created_by=current_user['user_id'],
+                            chunk_size=app.config['ACCOUNT_IMPORT_CHUNK_SIZE'])
+    report_text.flush()
+    report_text.detach()
+    report_file.seek(0)
+    
+    response = send_file(report_file, mimetype='text/csv', as_attachment=True,
+                         download_name='account-import-report.csv')
+    response.headers['X-Import-Created'] = str(stats['created'])
+    response.headers['X-Import-Rejected'] = str(stats['rejected'])
+    response.headers['X-Import-Rows-Per-Second'] = str(stats['rows_per_second'])
+    return response
+
 @app.route('/api/admin/tpos', methods=['GET'])
 @jwt_required()
 def get_tpos():
@@ -538,21 +1392,21 @@ def get_tpos():
             'message': 'Only super admin can view TPO accounts'
         }), 403
     
-    tpos = User.query.filter_by(user_type='tpo').all()
+    tpos = db.session.query(
+        User.id,
+        User.username,
+        User.email,
+        User.first_name,
+        User.last_name,
+        User.institute,
+        User.department,
+        User.is_active,
+        User.is_verified,
+        User.created_at
+    ).filter(User.user_type == 'tpo').order_by(User.id).all()
     return jsonify({
         'status': 'success',
-        'tpos': [{
-            'id': tpo.id,
-            'username': tpo.username,
-            'email': tpo.email,
-            'first_name': tpo.first_name,
-            'last_name': tpo.last_name,
-            'institute': tpo.institute,
-            'department': tpo.department,
-            'is_active': tpo.is_active,
-            'is_verified': tpo.is_verified,
-            'created_at': tpo.created_at.isoformat()
-        } for tpo in tpos]
+        'tpos': tpos
     }), 200
 
 @app.route('/api/admin/tpo/<int:tpo_id>', methods=['PUT'])
@@ -581,12 +1435,202 @@ def update_tpo(tpo_id):
         tpo.requires_password_reset = data['requires_password_reset']
     
     db.session.commit()
+    profile_cache.invalidate(tpo.id)
     
     return jsonify({
         'status': 'success',
         'message': 'TPO account updated successfully'
     }), 200
 
+@app.route('/api/admin/cache-stats', methods=['GET'])
+@jwt_required()
+def get_cache_stats():
+    current_user = get_jwt_identity()
+    if current_user['user_type'] != 'super_admin':
+        return jsonify({
+            'status': 'error',
+            'message': 'Only super admin can view cache statistics'
+        }), 403
+    
+    # Counters are per worker process; the pid tells repeated samples apart
+    return jsonify({
+        'status': 'success',
+        'pid': os.getpid(),
+        'profile_cache': profile_cache.stats(),
+        'job_list_cache': job_list_cache.stats(),
+        'job_matcher': job_matcher.stats()
+    }), 200
+
+# Dashboard statistics, read from the rollup tables only
+def stats_scope(tpo_allowed):
+    """Return ``(institute, error)``: the institute a TPO is limited to, or the
+    super admin's optional ``institute`` filter."""
+    current_user = get_jwt_identity()
+    if current_user['user_type'] == 'super_admin':
+        return request.args.get('institute'), None
+    if current_user['user_type'] == 'tpo' and tpo_allowed:
+        institute = db.session.query(User.institute).filter(User.id == current_user['user_id']).scalar()
+        if institute:
+            return institute, None
+        return None, (jsonify({
+            'status': 'error',
+            'message': 'Your account has no institute'
+        }), 400)
+    return None, (jsonify({
+        'status': 'error',
+        'message': 'You are not allowed to view these statistics'
+    }), 403)
+
+def int_arg(name, default, maximum):
+    """Return ``(value, error)`` for a positive integer query argument capped at ``maximum``."""
+    try:
+        return max(1, min(int(request.args.get(name, default)), maximum)), None
+    except ValueError:
+        return None, (jsonify({
+            'status': 'error',
+            'message': f'{name} must be an integer'
+        }), 400)
+
+def status_breakdown(table, keys, filters=(), order_by=None, limit=None):
+    """Sum ``table`` over ``keys`` with a total and one column per application status."""
+    total = func.sum(table.c.total).label('total')
+    query = select(*keys, total, *[
+        func.sum(case((table.c.status == status, table.c.total), else_=0)).label(status)
+        for status in APPLICATION_STATUSES
+    ]).where(*filters).group_by(*keys).having(func.sum(table.c.total) > 0)
+    query = query.order_by(*(order_by if order_by is not None else [total.desc(), *keys]))
+    if limit:
+        query = query.limit(limit)
+    return db.session.execute(query).all()
+
+def since_days(days):
+    return (datetime.utcnow() - timedelta(days=days - 1)).date()
+
+@app.route('/api/stats/applications/jobs', methods=['GET'])
+@jwt_required()
+def get_application_stats_by_job():
+    _, error = stats_scope(tpo_allowed=False)
+    if error:
+        return error
+    limit, error = int_arg('limit', app.config['JOBS_PAGE_SIZE'], app.config['JOBS_PAGE_SIZE_MAX'])
+    if error:
+        return error
+
+    table = stats_tables.by_job
+    rows = status_breakdown(table, [table.c.job_id], limit=limit)
+    # Labels for the page only, by primary key
+    labels = {job.id: job for job in db.session.query(Job.id, Job.company, Job.position).filter(
+        Job.id.in_([row.job_id for row in rows]))} if rows else {}
+    return jsonify({
+        'status': 'success',
+        'jobs': [dict(row._asdict(),
+                      company=labels[row.job_id].company if row.job_id in labels else None,
+                      position=labels[row.job_id].position if row.job_id in labels else None)
+                 for row in rows]
+    }), 200
+
+@app.route('/api/stats/applications/companies', methods=['GET'])
+@jwt_required()
+def get_application_stats_by_company():
+    _, error = stats_scope(tpo_allowed=False)
+    if error:
+        return error
+    limit, error = int_arg('limit', app.config['JOBS_PAGE_SIZE'], app.config['JOBS_PAGE_SIZE_MAX'])
+    if error:
+        return error
+
+    table = stats_tables.by_company
+    return jsonify({
+        'status': 'success',
+        'companies': status_breakdown(table, [table.c.company], limit=limit)
+    }), 200
+
+@app.route('/api/stats/applications/institutes', methods=['GET'])
+@jwt_required()
+def get_application_stats_by_institute():
+    institute, error = stats_scope(tpo_allowed=True)
+    if error:
+        return error
+    limit, error = int_arg('limit', app.config['JOBS_PAGE_SIZE'], app.config['JOBS_PAGE_SIZE_MAX'])
+    if error:
+        return error
+
+    table = stats_tables.by_institute
+    filters = [table.c.institute == institute] if institute else []
+    rows = status_breakdown(table, [table.c.institute], filters, limit=limit)
+    return jsonify({
+        'status': 'success',
+        'institutes': [dict(row._asdict(), institute=row.institute if row.institute != NO_INSTITUTE else None)
+                       for row in rows]
+    }), 200
+
+@app.route('/api/stats/applications/daily', methods=['GET'])
+@jwt_required()
+def get_daily_application_stats():
+    institute, error = stats_scope(tpo_allowed=True)
+    if error:
+        return error
+    days, error = int_arg('days', 30, 366)
+    if error:
+        return error
+
+    table = stats_tables.by_institute
+    filters = [table.c.day >= since_days(days)]
+    if institute:
+        filters.append(table.c.institute == institute)
+    return jsonify({
+        'status': 'success',
+        'institute': institute,
+        'days': status_breakdown(table, [table.c.day], filters, order_by=[table.c.day])
+    }), 200
+
+@app.route('/api/stats/jobs', methods=['GET'])
+@jwt_required()
+def get_job_stats():
+    _, error = stats_scope(tpo_allowed=True)
+    if error:
+        return error
+    limit, error = int_arg('limit', app.config['JOBS_PAGE_SIZE'], app.config['JOBS_PAGE_SIZE_MAX'])
+    if error:
+        return error
+
+    table = stats_tables.jobs
+    totals = dict(db.session.execute(
+        select(table.c.status, func.sum(table.c.total)).group_by(table.c.status)).all())
+    active = func.sum(case((table.c.status == 'active', table.c.total), else_=0)).label('active')
+    closed = func.sum(case((table.c.status == 'closed', table.c.total), else_=0)).label('closed')
+    companies = db.session.execute(
+        select(table.c.company, active, closed).group_by(table.c.company)
+        .having(func.sum(table.c.total) > 0).order_by(active.desc(), table.c.company).limit(limit)).all()
+    return jsonify({
+        'status': 'success',
+        'active': int(totals.get('active') or 0),
+        'closed': int(totals.get('closed') or 0),
+        'companies': companies
+    }), 200
+
+@app.route('/api/stats/signups', methods=['GET'])
+@jwt_required()
+def get_signup_stats():
+    _, error = stats_scope(tpo_allowed=False)
+    if error:
+        return error
+    days, error = int_arg('days', 30, 366)
+    if error:
+        return error
+
+    table = stats_tables.signups
+    totals = db.session.execute(
+        select(table.c.user_type, func.sum(table.c.total)).group_by(table.c.user_type)).all()
+    daily = db.session.execute(
+        select(table.c.day, table.c.user_type, table.c.total)
+        .where(table.c.day >= since_days(days), table.c.total > 0).order_by(table.c.day, table.c.user_type)).all()
+    return jsonify({
+        'status': 'success',
+        'totals': {user_type: int(total) for user_type, total in totals if total},
+        'days': daily
+    }), 200
+
 # Password Reset Route
 @app.route('/api/reset-password', methods=['POST'])
 @jwt_required()
@@ -607,6 +1651,7 @@ def reset_password():
     user.requires_password_reset = False
     
     db.session.commit()
+    profile_cache.invalidate(user.id)
     
     return jsonify({
         'status': 'success',
@@ -614,62 +1659,37 @@ def reset_password():
     }), 200
 
 @app.route('/register/student', methods=['POST'])
+@rate_limiter.limit('register')
 def register_student():
     data = request.get_json()
     
-    # Check if username or email already exists
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
-    
-    # Create new student user
-    user = User(
-        username=data['username'],
-        email=data['email'],
-        first_name=data['first_name'],
-        last_name=data['last_name'],
-        user_type='student'
-    )
-    user.set_password(data['password'])
-    
     try:
-        db.session.add(user)
-        db.session.commit()
-        return jsonify({'message': 'Registration successful'}), 201
-    except Exception as e:
+        user, error = register_account(data, 'student')
+    except SQLAlchemyError:
         db.session.rollback()
         return jsonify({'error': 'Registration failed'}), 500
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify({'message': 'Registration successful'}), 201
 
 @app.route('/register/employer', methods=['POST'])
+@rate_limiter.limit('register')
 def register_employer():
     data = request.get_json()
     
-    # Check if username or email already exists
-    if User.query.filter_by(username=data['username']).first():
-        return jsonify({'error': 'Username already exists'}), 400
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'error': 'Email already exists'}), 400
-    
-    # Create new employer user
-    user = User(
-        username=data['username'],
-        email=data['email'],
-        first_name=data['first_name'],
-        last_name=data['last_name'],
-        company_name=data['company_name'],
-        company_website=data['company_website'],
-        user_type='employer'
-    )
-    user.set_password(data['password'])
-    
     try:
-        db.session.add(user)
-        db.session.commit()
-        return jsonify({'message': 'Registration successful'}), 201
-    except Exception as e:
+        user, error = register_account(
+            data,
+            'employer',
+            company_name=data.get('company_name'),
+            company_website=data.get('company_website')
+        )
+    except SQLAlchemyError:
         db.session.rollback()
         return jsonify({'error': 'Registration failed'}), 500
+    if error:
+        return jsonify({'error': error}), 400
+    return jsonify({'message': 'Registration successful'}), 201
 
 # Initialize the database with a super admin account
 def init_db():
@@ -692,6 +1712,124 @@ def init_db():
             db.session.commit()
             print("Super admin account created. Username: admin, Password: admin123")
 
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Rebuild the job full-text search index."""
+    count = rebuild_job_search(db.session)
+    print(f"Search index rebuilt: {count} active jobs indexed")
+
+@app.cli.command('rebuild-stats')
+def rebuild_stats_command():
+    """Recompute the dashboard rollup tables from the source tables."""
+    counts = rebuild_rollups(db.session, stats_tables)
+    for table, rows in counts.items():
+        print(f"{table}: {rows} rows")
+
+@app.cli.command('run-tasks')
+@click.option('--workers', default=None, type=int, help='Worker threads (default: TASK_WORKERS, at least 1).')
+@click.option('--drain', is_flag=True, help='Run every task that is due, then exit.')
+def run_tasks_command(workers, drain):
+    """Run background tasks from the queue until interrupted."""
+    if drain:
+        count = 0
+        while task_queue.run_one():
+            count += 1
+        print(f"Ran {count} tasks")
+        return
+    workers = workers or app.config['TASK_WORKERS'] or 1
+    task_queue.start(workers)
+    print(f"Running background tasks with {workers} workers; Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(60)
+            counts, oldest = task_queue.depth()
+            print(f"queued={counts.get('queued', 0)} running={counts.get('running', 0)} "
+                  f"failed={counts.get('failed', 0)} oldest_ready={oldest:.1f}s")
+    except KeyboardInterrupt:
+        task_queue.stop()
+
+@app.cli.command('import-accounts')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--report', 'report_path', default='account-import-report.csv', show_default=True,
+              help='Where to write the created/rejected report.')
+@click.option('--admin', 'admin_username', default=None, help='Super admin recorded as creator (default: first one).')
+def import_accounts_command(csv_path, report_path, admin_username):
+    """Bulk import TPO and student accounts from a CSV file."""
+    query = User.query.filter_by(user_type='super_admin')
+    if admin_username:
+        query = query.filter_by(username=admin_username)
+    admin = query.order_by(User.id).first()
+    if not admin:
+        raise click.ClickException('No matching super admin account found')
+    
+    with open(csv_path, newline='', encoding='utf-8-sig') as source, \
+            open(report_path, 'w', newline='', encoding='utf-8') as report_file:
+        report = csv.DictWriter(report_file, fieldnames=REPORT_FIELDS)
+        report.writeheader()
+        stats = import_accounts(db.session, User, password_hasher, csv.DictReader(source), report,
+                                created_by=admin.id, chunk_size=app.config['ACCOUNT_IMPORT_CHUNK_SIZE'])
+    
+    print(f"Imported {stats['created']} accounts, rejected {stats['rejected']} "
+          f"in {stats['seconds']}s ({stats['rows_per_second']} rows/s). Report: {report_path}")
+
+def invalidate_shared_versions():
+    """Bump every version slot and epoch, so caches, ETags and the job matcher in running workers all refresh."""
+    versions.bump_all()
+    profile_cache.versions.bump_all()
+
+@app.cli.command('seed-data')
+@click.option('--students', default=200000, show_default=True)
+@click.option('--employers', default=2000, show_default=True)
+@click.option('--tpos', default=200, show_default=True)
+@click.option('--institutes', default=100, show_default=True)
+@click.option('--jobs', default=20000, show_default=True)
+@click.option('--applications', default=2000000, show_default=True)
+@click.option('--closed-share', default=0.2, show_default=True, help='Share of jobs created closed.')
+@click.option('--days', default=365, show_default=True, help='Spread creation dates over this many days.')
+@click.option('--seed', default=1, show_default=True, help='Same seed, same data.')
+@click.option('--now', type=click.DateTime(), default=None, help='Anchor for generated dates (default: current time).')
+@click.option('--prefix', default='seed', show_default=True, help='Prefix for generated usernames.')
+@click.option('--password', default='password123', show_default=True, help='Password of every generated account.')
+@click.option('--hash-method', default=None, help='Hash method for the shared password (default: PASSWORD_HASH_METHOD).')
+@click.option('--batch-size', default=10000, show_default=True)
+@click.option('--reset', is_flag=True, help='Drop and recreate all tables first.')
+def seed_data_command(students, employers, tpos, institutes, jobs, applications, closed_share, days, seed, now,
+                      prefix, password, hash_method, batch_size, reset):
+    """Generate a synthetic dataset of users, jobs and applications."""
+    if jobs and not employers:
+        raise click.ClickException('Jobs need at least one employer')
+    if (students or tpos) and not institutes:
+        raise click.ClickException('Students and TPOs need at least one institute')
+    if reset:
+        db.drop_all()
+        db.create_all()
+        invalidate_shared_versions()
+        print("Database tables recreated")
+    elif db.session.query(User.id).filter(
+            User.username_normalized.like(f"{escape_like(User.normalize(prefix) + '_')}%", escape='\\')).first():
+        raise click.ClickException(f"Accounts with prefix '{prefix}' already exist; use another --prefix or --reset")
+    db.session.close()
+    
+    # One hash for every account: hashing millions of passwords would dominate the load time
+    password_hash = PasswordHasher(hash_method or app.config['PASSWORD_HASH_METHOD']).hash(password)
+    options = {
+        'students': students, 'employers': employers, 'tpos': tpos, 'institutes': institutes, 'jobs': jobs,
+        'applications': applications, 'closed_share': closed_share, 'days': days, 'seed': seed, 'now': now,
+        'prefix': User.normalize(prefix), 'batch_size': batch_size
+    }
+    print(f"Seeding {students} students, {employers} employers, {tpos} TPOs, {jobs} jobs "
+          f"and {applications} applications (seed {seed})")
+    counts = seed_database(db.engine, User.__table__, Job.__table__, JobApplication.__table__,
+                           password_hash, options)
+    # After a reset the new rows reuse old ids, and running workers may have
+    # cached or tagged anything under them while seeding was under way
+    if reset:
+        invalidate_shared_versions()
+    else:
+        versions.bump(JOB_BOARD)
+    print(f"Seeded {counts['users']} users, {counts['jobs']} jobs and {counts['applications']} applications "
+          f"in {counts['seconds']}s")
+
 if __name__ == '__main__':
     try:
         # Make sure database exists first
@@ -0,0 +1,171 @@
+"""Structured JSON logging that never blocks the request thread.
+
+Request threads only put records on a bounded in-memory queue; a background
+listener thread formats them as JSON lines and writes them out. When the
+queue is full records are dropped and counted instead of stalling requests.
+
+Every record carries the request's correlation id (taken from the
+``X-Request-ID`` header or generated, and echoed back in the response).
+High-volume success messages are logged with ``extra={'sample': True}`` and
+only a ``LOG_SAMPLE_RATE`` share of them is kept.
+
+Configuration:
+
+    LOG_LEVEL         root level (default INFO)
+    LOG_LEVELS        per-logger overrides, e.g. "app=WARNING,search=DEBUG"
+    LOG_SAMPLE_RATE   share of sampled records to keep, 0..1 (default 0.01)
+    LOG_QUEUE_SIZE    records buffered before dropping (default 10000)
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+
+from flask import g, request
+
+request_id_var = contextvars.ContextVar('request_id', default=None)
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RESERVED = set(logging.LogRecord('', 0, '', 0, '', None, None).__dict__) | {'message', 'asctime', 'sample'}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'pid': record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the correlation id of the request that logged them."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only ``rate`` of the records logged with ``extra={'sample': True}``."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return not getattr(record, 'sample', False) or random.random() < self.rate
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops (and counts) records instead of blocking when full."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Leave formatting to the listener thread; only freeze the message so
+        # mutable arguments cannot change before it is written
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler = None
+_listener = None
+
+
+def _start_listener(log_queue, handler):
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def setup_logging(app, stream=None):
+    """Install the queue handler on the root logger and per-request correlation ids."""
+    global _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    # Skip the per-record work the JSON lines never show (see "Optimization" in the logging HOWTO)
+    logging._srcfile = None
+    logging.logMultiprocessing = False
+    logging.logThreads = False
+
+    log_queue = queue.Queue(maxsize=app.config['LOG_QUEUE_SIZE'])
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _queue_handler.addFilter(SamplingFilter(app.config['LOG_SAMPLE_RATE']))
+    _queue_handler.addFilter(RequestContextFilter())
+
+    writer = logging.StreamHandler(stream or sys.stderr)
+    writer.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [_queue_handler]
+    root.setLevel(app.config['LOG_LEVEL'])
+    for override in filter(None, app.config['LOG_LEVELS'].split(',')):
+        name, _, level = override.partition('=')
+        logging.getLogger(name.strip()).setLevel(level.strip().upper())
+
+    _start_listener(log_queue, writer)
+    atexit.register(lambda: _listener and _listener.stop())
+    # The listener thread does not survive fork(); pre-forking servers get a fresh one per worker
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=lambda: _start_listener(log_queue, writer))
+
+    @app.before_request
+    def assign_request_id():
+        request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+        g.request_id = request_id
+        request_id_var.set(request_id)
+
+    @app.after_request
+    def echo_request_id(response):
+        if 'request_id' in g:
+            response.headers['X-Request-ID'] = g.request_id
+        return response
+
+    @app.teardown_request
+    def clear_request_id(error=None):
+        # Worker threads are reused; don't let the id leak into later non-request logs
+        request_id_var.set(None)
+
+    return _queue_handler
+
+
+def log_stats():
+    if _queue_handler is None:
+        return {}
+    return {
+        'enqueued': _queue_handler.enqueued,
+        'dropped': _queue_handler.dropped,
+        'queued': _queue_handler.queue.qsize()
+    }
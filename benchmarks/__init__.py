@@ -0,0 +1 @@
+"""Benchmarks for the placement portal API. Run each module with ``python -m benchmarks.<name>``."""
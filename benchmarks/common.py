@@ -0,0 +1,41 @@
+"""Helpers shared by the benchmark scripts."""
+import os
+import tempfile
+import time
+
+
+def load_app(database_url=None, **env):
+    """Import the Flask app against ``database_url`` (a throwaway SQLite file by default).
+
+    app.py reads its configuration at import time, so the environment has to
+    be in place before the first import.
+    """
+    if database_url is None:
+        handle, path = tempfile.mkstemp(prefix='bench-', suffix='.db')
+        os.close(handle)
+        database_url = f'sqlite:///{path}'
+    os.environ['DATABASE_URL'] = database_url
+    for key, value in env.items():
+        os.environ[key] = str(value)
+
+    import app as app_module
+    with app_module.app.app_context():
+        app_module.db.drop_all()
+        app_module.db.create_all()
+    return app_module
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
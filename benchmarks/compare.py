@@ -0,0 +1,74 @@
+"""Compare two benchmark result files and flag regressions.
+
+An endpoint regresses when its p95 latency grows, or its throughput drops,
+by more than ``--threshold`` (relative). Endpoints with fewer than
+``MIN_SAMPLES`` requests in either run are reported but never flagged; their
+tail percentiles are too noisy to judge.
+
+    python -m benchmarks.compare old.json new.json --threshold 0.2
+"""
+import argparse
+import json
+
+MIN_SAMPLES = 50
+# metric -> True when a larger value is worse
+METRICS = {'p95_ms': True, 'throughput': False}
+
+
+def compare_results(baseline, current, threshold=0.2):
+    """Return ``[(endpoint, metric, old, new, change)]`` for every regression."""
+    regressions = []
+    for name, new in current['endpoints'].items():
+        old = baseline['endpoints'].get(name)
+        if old is None or min(old['requests'], new['requests']) < MIN_SAMPLES:
+            continue
+        for metric, higher_is_worse in METRICS.items():
+            if not old[metric]:
+                continue
+            change = (new[metric] - old[metric]) / old[metric]
+            if (change if higher_is_worse else -change) > threshold:
+                regressions.append((name, metric, old[metric], new[metric], change))
+    return regressions
+
+
+def print_comparison(baseline, current, regressions):
+    print(f"baseline {baseline.get('commit')} ({baseline.get('timestamp')}) -> "
+          f"current {current.get('commit')} ({current.get('timestamp')})")
+    for name, new in current['endpoints'].items():
+        old = baseline['endpoints'].get(name)
+        if old is None:
+            print(f"  {name:<12} new endpoint")
+            continue
+        changes = ', '.join(
+            f"{metric} {old[metric]} -> {new[metric]}" for metric in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput')
+        )
+        print(f"  {name:<12} {changes}")
+    if baseline.get('config') != current.get('config'):
+        print("  note: the runs used different configurations")
+    if regressions:
+        print("REGRESSIONS:")
+        for name, metric, old, new, change in regressions:
+            print(f"  {name} {metric}: {old} -> {new} ({change:+.0%})")
+    else:
+        print("no regressions")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    regressions = compare_results(baseline, current, args.threshold)
+    print_comparison(baseline, current, regressions)
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
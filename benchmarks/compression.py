@@ -0,0 +1,82 @@
+"""Bytes on the wire vs. CPU per response for each compression setting.
+
+Payloads are real responses from a seeded app: listing pages with and
+without requirements, a student's applications, the TPO list and an NDJSON
+export. Each is compressed at several gzip levels and, when the module is
+installed, brotli qualities.
+
+    python -m benchmarks.compression --repeat 50
+"""
+import argparse
+import time
+
+from benchmarks.common import load_app
+from compression import _Brotli, _Gzip, brotli
+from seed_data import seed_database
+
+PASSWORD = 'bench-password'
+
+
+def fetch_payloads(app_module):
+    client = app_module.app.test_client()
+
+    def token(username, user_type, password=PASSWORD):
+        response = client.post('/api/login', json={'username': username, 'password': password, 'user_type': user_type})
+        return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    student = token('bench_student0', 'student')
+    employer = token('bench_employer0', 'employer')
+    admin = token('admin', 'super_admin', 'admin123')
+    return {
+        'available, 50 jobs': client.get('/api/jobs/available', headers=student).data,
+        'available, 200 + requirements': client.get('/api/jobs/available?limit=200&include=requirements',
+                                                    headers=student).data,
+        'applied': client.get('/api/jobs/applied', headers=student).data,
+        'tpos': client.get('/api/admin/tpos', headers=admin).data,
+        'employer export, ndjson': client.get('/api/employer/applications/export?format=ndjson',
+                                              headers=employer).data,
+    }
+
+
+def measure(make, payload, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        compressor = make()
+        size = len(compressor.compress(payload) + compressor.finish())
+    return size, (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--gzip-levels', default='1,4,6,9')
+    parser.add_argument('--brotli-qualities', default='1,4,6,11')
+    args = parser.parse_args()
+
+    app_module = load_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', LOG_LEVEL='WARNING')
+    app_module.init_db()  # super admin 'admin' / 'admin123'
+    with app_module.app.app_context():
+        db = app_module.db
+        seed_database(db.engine, app_module.User.__table__, app_module.Job.__table__,
+                      app_module.JobApplication.__table__, app_module.password_hasher.hash(PASSWORD),
+                      {'students': 200, 'employers': 5, 'tpos': 300, 'institutes': 20, 'jobs': 500,
+                       'applications': 4000, 'closed_share': 0.1, 'days': 90, 'seed': 1, 'prefix': 'bench',
+                       'batch_size': 10000})
+
+    settings = [(f'gzip {level}', lambda level=int(level): _Gzip(level)) for level in args.gzip_levels.split(',')]
+    if brotli is not None:
+        settings += [(f'br {quality}', lambda quality=int(quality): _Brotli(quality))
+                     for quality in args.brotli_qualities.split(',')]
+    else:
+        print("brotli is not installed; showing gzip only")
+
+    for name, payload in fetch_payloads(app_module).items():
+        print(f"{name}: {len(payload) / 1024:.1f} KiB uncompressed")
+        for label, make in settings:
+            size, seconds = measure(make, payload, args.repeat)
+            print(f"  {label:>8}: {size / 1024:7.1f} KiB ({size / len(payload):6.1%})  "
+                  f"{seconds * 1e6:8.0f} us  {len(payload) / seconds / 2 ** 20:7.1f} MiB/s")
+
+
+if __name__ == '__main__':
+    main()
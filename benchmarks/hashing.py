@@ -0,0 +1,58 @@
+"""Logins per second per core, hashing inline vs. on the process pool.
+
+    python -m benchmarks.hashing --logins 200 --concurrency 8
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import Timer, load_app
+
+
+def run_logins(app_module, count, concurrency):
+    client = app_module.app.test_client()
+    payload = {'username': 'bench', 'password': 'bench-password', 'user_type': 'student'}
+
+    def login(_):
+        response = client.post('/api/login', json=payload)
+        assert response.status_code == 200, response.get_json()
+
+    with Timer() as timer, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(login, range(count)))
+    return count / timer.elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='process pool size for the pooled run')
+    parser.add_argument('--method', default='scrypt')
+    args = parser.parse_args()
+
+    app_module = load_app(PASSWORD_HASH_METHOD=args.method, RATE_LIMIT_ENABLED=0)
+    from passwords import PasswordHasher
+
+    cores = os.cpu_count() or 1
+    results = {}
+    for label, workers in (('inline', 0), ('pool', args.workers)):
+        app_module.password_hasher = PasswordHasher(method=args.method, workers=workers,
+                                                    queue_size=args.concurrency, timeout=60)
+        with app_module.app.app_context():
+            app_module.User.query.filter_by(username='bench').delete()
+            user = app_module.User(username='bench', email='bench@example.com', user_type='student')
+            user.set_password('bench-password')
+            app_module.db.session.add(user)
+            app_module.db.session.commit()
+
+        run_logins(app_module, min(args.logins, 2 * args.concurrency), args.concurrency)  # warm up
+        results[label] = run_logins(app_module, args.logins, args.concurrency)
+        app_module.password_hasher.shutdown()
+
+    for label, rate in results.items():
+        print(f"{label:>6}: {rate:8.1f} logins/s  {rate / cores:7.1f} logins/s/core")
+    print(f"speedup: {results['pool'] / results['inline']:.2f}x on {cores} cores")
+
+
+if __name__ == '__main__':
+    main()
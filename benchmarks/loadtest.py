@@ -0,0 +1,280 @@
+"""Replay a weighted mix of API calls against a seeded database.
+
+The app is booted in-process against a throwaway SQLite file (or the
+database given with ``--database-url``, which is dropped and re-seeded), and
+worker threads replay login, profile, available/applied listings and apply
+calls. With ``--url`` the same mix goes over HTTP to an already running
+server instead; that server must use the same ``DATABASE_URL`` and run with
+``RATE_LIMIT_ENABLED=0``, since every simulated user logs in from one address.
+
+Throughput and p50/p95/p99 latency are reported per endpoint and saved as
+JSON. Pass ``--baseline`` with an earlier result file to flag regressions;
+the exit status is 1 when any endpoint got slower than ``--threshold``.
+
+    python -m benchmarks.loadtest --requests 5000 --concurrency 16
+    python -m benchmarks.loadtest --mix profile=50,available=50 --baseline old.json
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from sqlalchemy import select
+
+from benchmarks.common import Timer, load_app, percentile
+from benchmarks.compare import compare_results, print_comparison
+from seed_data import seed_database
+
+DEFAULT_MIX = 'login=5,profile=25,available=35,applied=20,apply=15'
+PASSWORD = 'bench-password'
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in filter(None, spec.split(',')):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Unknown endpoint '{name}' in --mix; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def seed(app_module, students, employers, jobs, applications, seed_value, method):
+    """Load a synthetic dataset and return the student usernames and active job ids."""
+    password_hash = app_module.PasswordHasher(method).hash(PASSWORD)
+    options = {
+        'students': students, 'employers': employers, 'tpos': 0, 'institutes': 10, 'jobs': jobs,
+        'applications': applications, 'closed_share': 0.1, 'days': 90, 'seed': seed_value,
+        'prefix': 'bench', 'batch_size': 10000
+    }
+    with app_module.app.app_context():
+        db, Job = app_module.db, app_module.Job
+        seed_database(db.engine, app_module.User.__table__, Job.__table__, app_module.JobApplication.__table__,
+                      password_hash, options)
+        job_ids = db.session.execute(select(Job.id).where(Job.status == 'active')).scalars().all()
+    return [f'bench_student{i}' for i in range(students)], job_ids
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, json_body=None, token=None):
+        headers = {'Authorization': f'Bearer {token}'} if token else {}
+        response = self.client.open(path, method=method, json=json_body, headers=headers)
+        return response.status_code, response.get_data()
+
+
+class HttpClient:
+    """One keep-alive connection per worker thread."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.prefix = parts.path.rstrip('/')
+        self.local = threading.local()
+
+    def request(self, method, path, json_body=None, token=None):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = self.connection_class(self.netloc, timeout=30)
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        body = json.dumps(json_body) if json_body is not None else None
+        try:
+            connection.request(method, self.prefix + path, body=body, headers=headers)
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            self.local.connection = None
+            raise
+
+
+def _login(client, state, rng):
+    return client.request('POST', '/api/login', {
+        'username': rng.choice(state['students']), 'password': PASSWORD, 'user_type': 'student'})
+
+
+def _profile(client, state, rng):
+    return client.request('GET', '/api/profile', token=rng.choice(state['tokens']))
+
+
+def _available(client, state, rng):
+    return client.request('GET', '/api/jobs/available', token=rng.choice(state['tokens']))
+
+
+def _applied(client, state, rng):
+    return client.request('GET', '/api/jobs/applied', token=rng.choice(state['tokens']))
+
+
+def _apply(client, state, rng):
+    return client.request('POST', f"/api/jobs/{rng.choice(state['jobs'])}/apply",
+                          token=rng.choice(state['tokens']))
+
+
+OPERATIONS = {
+    'login': _login,
+    'profile': _profile,
+    'available': _available,
+    'applied': _applied,
+    'apply': _apply,
+}
+
+# Statuses that are a correct answer for the operation, not a failure
+EXPECTED_STATUSES = {
+    'apply': {201, 400},  # 400 when the student already applied
+}
+
+
+def run(client, state, mix, requests, concurrency, seed_value):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    plan = random.Random(seed_value).choices(names, weights, k=requests)
+    latencies = defaultdict(list)
+    statuses = defaultdict(Counter)
+    errors = Counter()
+    lock = threading.Lock()
+
+    def call(indexed):
+        index, name = indexed
+        rng = random.Random(seed_value * 1_000_003 + index)
+        start = time.perf_counter()
+        try:
+            status, _ = OPERATIONS[name](client, state, rng)
+        except Exception:
+            status = 'exception'
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies[name].append(elapsed)
+            statuses[name][str(status)] += 1
+            if status not in EXPECTED_STATUSES.get(name, {200}):
+                errors[name] += 1
+
+    with Timer() as timer, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(call, enumerate(plan)))
+    return timer.elapsed, latencies, statuses, errors
+
+
+def summarize(elapsed, latencies, statuses, errors):
+    endpoints = {}
+    for name in sorted(latencies):
+        values = sorted(latencies[name])
+        endpoints[name] = {
+            'requests': len(values),
+            'errors': errors[name],
+            'statuses': dict(statuses[name]),
+            'throughput': round(len(values) / elapsed, 2),
+            'mean_ms': round(sum(values) / len(values) * 1000, 3),
+            'p50_ms': round(percentile(values, 50) * 1000, 3),
+            'p95_ms': round(percentile(values, 95) * 1000, 3),
+            'p99_ms': round(percentile(values, 99) * 1000, 3),
+        }
+    everything = sorted(value for values in latencies.values() for value in values)
+    total = {
+        'requests': len(everything),
+        'errors': sum(errors.values()),
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(everything) / elapsed, 2) if elapsed else 0.0,
+        'p50_ms': round(percentile(everything, 50) * 1000, 3),
+        'p95_ms': round(percentile(everything, 95) * 1000, 3),
+        'p99_ms': round(percentile(everything, 99) * 1000, 3),
+    }
+    return endpoints, total
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'endpoint weights (default {DEFAULT_MIX})')
+    parser.add_argument('--database-url', help='database to seed and test against (default: throwaway SQLite)')
+    parser.add_argument('--url', help='send requests to a running server instead of the in-process app')
+    parser.add_argument('--students', type=int, default=1000)
+    parser.add_argument('--employers', type=int, default=50)
+    parser.add_argument('--jobs', type=int, default=500)
+    parser.add_argument('--applications', type=int, default=5000)
+    parser.add_argument('--method', default='pbkdf2:sha256:1000', help='password hash method for seeded users')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='result file (default benchmarks/results/loadtest-<commit>-<time>.json)')
+    parser.add_argument('--baseline', help='earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.2, help='relative slowdown flagged as a regression')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    rng = random.Random(args.seed)
+    app_module = load_app(args.database_url, PASSWORD_HASH_METHOD=args.method, LOG_LEVEL='WARNING', RATE_LIMIT_ENABLED=0)
+    students, job_ids = seed(app_module, args.students, args.employers, args.jobs, args.applications, args.seed,
+                            args.method)
+    client = HttpClient(args.url) if args.url else InProcessClient(app_module.app)
+
+    # Log a slice of the students in up front so authenticated calls don't all pay for hashing
+    state = {'students': students, 'jobs': job_ids, 'tokens': []}
+    for username in rng.sample(students, min(len(students), max(args.concurrency * 4, 50))):
+        status, body = client.request('POST', '/api/login', {
+            'username': username, 'password': PASSWORD, 'user_type': 'student'})
+        if status != 200:
+            raise SystemExit(f'Warm-up login failed with {status}: {body[:200]!r}')
+        state['tokens'].append(json.loads(body)['access_token'])
+
+    elapsed, latencies, statuses, errors = run(client, state, mix, args.requests, args.concurrency, args.seed)
+    endpoints, total = summarize(elapsed, latencies, statuses, errors)
+
+    result = {
+        'benchmark': 'loadtest',
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'target': args.url or app_module.app.config['SQLALCHEMY_DATABASE_URI'].split('://', 1)[0],
+        'config': {key: getattr(args, key) for key in (
+            'requests', 'concurrency', 'mix', 'students', 'employers', 'jobs', 'applications', 'method', 'seed')},
+        'endpoints': endpoints,
+        'total': total,
+    }
+
+    print(f"{total['requests']} requests at concurrency {args.concurrency} in {total['seconds']}s: "
+          f"{total['throughput']} req/s, {total['errors']} errors")
+    print(f"{'endpoint':<12}{'req':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, stats in endpoints.items():
+        print(f"{name:<12}{stats['requests']:>8}{stats['throughput']:>10}{stats['p50_ms']:>10}"
+              f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>8}")
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S')
+        output = os.path.join(RESULTS_DIR, f"loadtest-{result['commit'] or 'nogit'}-{stamp}.json")
+    with open(output, 'w') as f:
+        json.dump(result, f, indent=2)
+    print(f"results written to {output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_results(baseline, result, args.threshold)
+        print_comparison(baseline, result, regressions)
+        if regressions:
+            raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,49 @@
+"""Per-call cost on the request thread: print() vs. the queued JSON logger.
+
+print() is measured against /dev/null, its best case; behind a full pipe it
+blocks for as long as the reader is behind, while the logger only enqueues.
+
+    python -m benchmarks.logging_overhead --calls 100000
+"""
+import argparse
+import contextlib
+import logging
+import os
+import time
+
+from benchmarks.common import load_app
+
+
+def per_call_us(fn, calls):
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=100000)
+    args = parser.parse_args()
+
+    # Loaded for its logging setup; the queue is large enough that nothing is dropped
+    load_app(LOG_QUEUE_SIZE=args.calls * 3, LOG_SAMPLE_RATE=0.01)
+    logger = logging.getLogger('benchmark')
+    from applog import log_stats
+
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        results = {
+            'print()': per_call_us(lambda i: print(f"Login successful: username=user{i}, user_type=student"), args.calls),
+            'logger.info': per_call_us(lambda i: logger.info("Login successful", extra={'username': f'user{i}'}), args.calls),
+            'logger.info sampled': per_call_us(
+                lambda i: logger.info("Login successful", extra={'username': f'user{i}', 'sample': True}), args.calls),
+            'logger.debug (disabled)': per_call_us(lambda i: logger.debug("Profile request", extra={'user_id': i}), args.calls),
+        }
+
+    for label, cost in results.items():
+        print(f"{label:>24}: {cost:7.2f} us/call")
+    print(f"queue: {log_stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Latency of /api/jobs/recommended over a large job board.
+
+Seeds the jobs and applications, builds the matcher once (the first request
+of each worker pays for that), then times the top-k scoring on its own and
+the whole request.
+
+    python -m benchmarks.recommend --jobs 50000 --repeat 200
+"""
+import argparse
+import time
+
+from benchmarks.common import load_app, percentile
+from seed_data import seed_database
+
+PASSWORD = 'bench-password'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=50000)
+    parser.add_argument('--students', type=int, default=200)
+    parser.add_argument('--applications', type=int, default=5000)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    app_module = load_app(PASSWORD_HASH_METHOD='pbkdf2:sha256:1000', LOG_LEVEL='WARNING', RATE_LIMIT_ENABLED=0)
+    app, db = app_module.app, app_module.db
+    with app.app_context():
+        seed_database(db.engine, app_module.User.__table__, app_module.Job.__table__,
+                      app_module.JobApplication.__table__, app_module.password_hasher.hash(PASSWORD),
+                      {'students': args.students, 'employers': 50, 'tpos': 0, 'institutes': 5, 'jobs': args.jobs,
+                       'applications': args.applications, 'closed_share': 0.1, 'days': 90, 'seed': 1,
+                       'prefix': 'bench', 'batch_size': 10000})
+
+    client = app.test_client()
+    response = client.post('/api/login', json={'username': 'bench_student0', 'password': PASSWORD,
+                                               'user_type': 'student'})
+    headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+    start = time.perf_counter()
+    body = client.get(f'/api/jobs/recommended?limit={args.limit}', headers=headers).get_json()
+    print(f"first request (builds the matcher): {(time.perf_counter() - start) * 1000:.0f} ms; "
+          f"{app_module.job_matcher.stats()}")
+    print(f"personalized: {body['personalized']}; top: {[job['position'] for job in body['jobs'][:3]]}")
+
+    matcher = app_module.job_matcher
+    with app.app_context():
+        history = db.session.query(app_module.Job.position, app_module.Job.requirements).limit(20).all()
+    query = matcher.query_vector(history)
+    scoring = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        matcher.top(query, args.limit)
+        scoring.append(time.perf_counter() - start)
+
+    requests = []
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        client.get(f'/api/jobs/recommended?limit={args.limit}', headers=headers)
+        requests.append(time.perf_counter() - start)
+
+    for label, timings in (('top-k scoring', scoring), ('full request', requests)):
+        timings.sort()
+        print(f"{label:>14}: p50={percentile(timings, 50) * 1000:.2f} ms  p95={percentile(timings, 95) * 1000:.2f} ms  "
+              f"p99={percentile(timings, 99) * 1000:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
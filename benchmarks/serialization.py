@@ -0,0 +1,85 @@
+"""Time and allocations to build one large listing response.
+
+Compares the old path (hydrated ORM objects, a dict per row, Flask's stdlib
+provider) with column Rows serialized directly, through the stdlib and
+through orjson.
+
+    python -m benchmarks.serialization --rows 10000 --repeat 10
+"""
+import argparse
+import time
+import tracemalloc
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.common import load_app
+from seed_data import seed_database
+import json_provider
+
+
+def measure(app, build, repeat):
+    with app.test_request_context():
+        build()  # warm caches and compiled statements
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            build()
+            timings.append(time.perf_counter() - start)
+        tracemalloc.start()
+        size = len(build())
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return min(timings), peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    app_module = load_app(LOG_LEVEL='WARNING')
+    app, db, Job = app_module.app, app_module.db, app_module.Job
+    with app.app_context():
+        seed_database(db.engine, app_module.User.__table__, Job.__table__, app_module.JobApplication.__table__,
+                      'unused', {'students': 0, 'employers': 50, 'tpos': 0, 'institutes': 1, 'jobs': args.rows,
+                                 'applications': 0, 'closed_share': 0, 'days': 90, 'seed': 1, 'prefix': 'bench',
+                                 'batch_size': 10000})
+    stdlib = DefaultJSONProvider(app)
+    fast = app_module.FastJSONProvider(app)
+
+    def orm_dicts():
+        jobs = Job.query.filter_by(status='active').order_by(Job.created_at.desc(), Job.id.desc()).all()
+        db.session.expunge_all()
+        return stdlib.response({'status': 'success', 'jobs': [{
+            'id': job.id,
+            'company': job.company,
+            'position': job.position,
+            'created_at': job.created_at.isoformat()
+        } for job in jobs]}).get_data()
+
+    def rows(provider):
+        def build():
+            result = db.session.query(Job.id, Job.company, Job.position, Job.created_at).filter(
+                Job.status == 'active').order_by(Job.created_at.desc(), Job.id.desc()).all()
+            return provider.response({'status': 'success', 'jobs': result}).get_data()
+        return build
+
+    # The provider picks orjson at call time; hide it for the stdlib run
+    orjson = json_provider.orjson
+    json_provider.orjson = None
+    results = {'ORM objects + dicts, stdlib': measure(app, orm_dicts, args.repeat),
+               'Rows, stdlib': measure(app, rows(fast), args.repeat)}
+    json_provider.orjson = orjson
+    if orjson is not None:
+        results['Rows, orjson'] = measure(app, rows(fast), args.repeat)
+    else:
+        print("orjson is not installed; skipping the orjson case")
+
+    print(f"{args.rows} rows per response, best of {args.repeat}")
+    for label, (seconds, peak, size) in results.items():
+        print(f"{label:>28}: {seconds * 1000:8.1f} ms  peak alloc {peak / 1024:8.0f} KiB  body {size / 1024:.0f} KiB")
+
+
+if __name__ == '__main__':
+    main()
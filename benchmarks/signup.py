@@ -0,0 +1,70 @@
+"""Concurrent signups through /api/register.
+
+A share of the requests reuse an earlier username or email in different
+letter case, so the run also checks that the unique constraints reject
+every duplicate and that no duplicate row gets in.
+
+    python -m benchmarks.signup --signups 500 --concurrency 16 --duplicates 0.2
+"""
+import argparse
+import random
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import Timer, load_app, percentile
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--signups', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--duplicates', type=float, default=0.2, help='share of requests reusing a taken name')
+    parser.add_argument('--method', default='pbkdf2:sha256:1000', help='password hash method for the run')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    app_module = load_app(PASSWORD_HASH_METHOD=args.method, RATE_LIMIT_ENABLED=0)
+    client = app_module.app.test_client()
+    rng = random.Random(args.seed)
+
+    payloads = []
+    for i in range(args.signups):
+        if payloads and rng.random() < args.duplicates:
+            original = rng.choice(payloads)
+            if rng.random() < 0.5:
+                payload = dict(original, username=original['username'].upper(), email=f'fresh{i}@example.com')
+            else:
+                payload = dict(original, username=f'fresh{i}', email=original['email'].upper())
+        else:
+            payload = {'username': f'user{i}', 'email': f'user{i}@example.com'}
+        payload.update(password='bench-password', user_type='student', first_name='Bench', last_name='User')
+        payloads.append(payload)
+
+    latencies = []
+    statuses = Counter()
+
+    def signup(payload):
+        start = time.perf_counter()
+        response = client.post('/api/register', json=payload)
+        latencies.append(time.perf_counter() - start)
+        statuses[response.status_code] += 1
+
+    with Timer() as timer, ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(signup, payloads))
+
+    with app_module.app.app_context():
+        rows = app_module.User.query.count()
+
+    latencies.sort()
+    print(f"signups: {args.signups} at concurrency {args.concurrency}")
+    print(f"throughput: {args.signups / timer.elapsed:.1f} req/s")
+    print(f"latency ms: p50={percentile(latencies, 50) * 1000:.1f} "
+          f"p95={percentile(latencies, 95) * 1000:.1f} p99={percentile(latencies, 99) * 1000:.1f}")
+    print(f"responses: {dict(statuses)}; users in table: {rows}")
+    if statuses[201] != rows:
+        raise SystemExit('Mismatch between successful signups and stored users')
+
+
+if __name__ == '__main__':
+    main()
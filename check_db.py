@@ -0,0 +1,17 @@
+from app import app, db
+from dbpool import database_health
+import json
+import sys
+
+def check_db():
+    with app.app_context():
+        healthy, report = database_health(db.engine)
+    print(json.dumps(report, indent=2))
+    if healthy:
+        print("Database connection OK")
+    else:
+        print("Database connection FAILED. Check DATABASE_URL in your .env file")
+    return healthy
+
+if __name__ == "__main__":
+    sys.exit(0 if check_db() else 1)
@@ -0,0 +1,156 @@
+"""gzip/brotli compression of responses, negotiated per request.
+
+Buffered responses are compressed once they reach ``COMPRESSION_MIN_SIZE``
+bytes; below that the headers and CPU cost more than they save. Streamed
+responses (generators) are compressed chunk by chunk, with a sync flush after
+every chunk, so the client still gets each piece (an NDJSON result line, an
+export batch) as soon as it is produced.
+
+Responses that already carry a Content-Encoding (precompressed pages,
+gzip exports), file passthroughs, non-text types and ``no-transform``
+responses are left alone.
+
+Configuration:
+
+    COMPRESSION_LEVEL           gzip level, 1-9 (default 6)
+    COMPRESSION_BROTLI_QUALITY  brotli quality, 0-11 (default 4); brotli is used only when installed
+    COMPRESSION_MIN_SIZE        smallest buffered body worth compressing, in bytes (default 1024)
+"""
+import threading
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+COMPRESSIBLE_TYPES = {
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'image/svg+xml'
+}
+
+
+def compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in COMPRESSIBLE_TYPES)
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip header
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def flush(self):
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def flush(self):
+        return self._compressor.flush()
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class Compression:
+    def __init__(self, app=None):
+        self.level = 6
+        self.brotli_quality = 4
+        self.min_size = 1024
+        self._lock = threading.Lock()
+        self.bytes_in = {}
+        self.bytes_out = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.level = app.config['COMPRESSION_LEVEL']
+        self.brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+        self.min_size = app.config['COMPRESSION_MIN_SIZE']
+        app.after_request(self.compress_response)
+
+    def negotiate(self):
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            return 'br'
+        if accepted['gzip']:
+            return 'gzip'
+        return None
+
+    def compressor(self, encoding):
+        return _Brotli(self.brotli_quality) if encoding == 'br' else _Gzip(self.level)
+
+    def _count(self, encoding, before, after):
+        with self._lock:
+            self.bytes_in[encoding] = self.bytes_in.get(encoding, 0) + before
+            self.bytes_out[encoding] = self.bytes_out.get(encoding, 0) + after
+
+    def compress_response(self, response):
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.direct_passthrough
+                or not compressible(response.mimetype)
+                or 'no-transform' in response.headers.get('Cache-Control', '')):
+            return response
+        encoding = self.negotiate()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressor = self.compressor(encoding)
+            compressed = compressor.compress(data) + compressor.finish()
+            self._count(encoding, len(data), len(compressed))
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        # A strong validator names one exact byte sequence; the encoded body is a different one
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(f'{etag}-{encoding}')
+        return response
+
+    def _stream(self, chunks, encoding):
+        compressor = self.compressor(encoding)
+        before = after = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                if not chunk:
+                    continue
+                data = compressor.compress(chunk) + compressor.flush()
+                before += len(chunk)
+                after += len(data)
+                yield data
+            data = compressor.finish()
+            after += len(data)
+            yield data
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close is not None:
+                close()
+            self._count(encoding, before, after)
+
+    def stats(self):
+        with self._lock:
+            return {encoding: {'bytes_in': self.bytes_in[encoding], 'bytes_out': self.bytes_out[encoding]}
+                    for encoding in self.bytes_in}
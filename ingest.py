@@ -0,0 +1,121 @@
+"""Incremental parsing of large request bodies.
+
+Records are decoded from the raw request stream as they arrive, so memory use
+depends on the size of one record and one batch, not on the whole payload.
+Two formats are accepted and told apart by the first non-blank byte:
+
+- a JSON array of objects (``[{...}, {...}]``)
+- NDJSON, one JSON object per line
+"""
+import codecs
+import json
+
+READ_SIZE = 64 * 1024
+MAX_RECORD_SIZE = 1024 * 1024
+
+
+class RecordError(ValueError):
+    """A single record could not be decoded; parsing continues with the next one."""
+
+
+def _chunks(stream):
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    while True:
+        chunk = stream.read(READ_SIZE)
+        if not chunk:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            return
+        yield decoder.decode(chunk)
+
+
+def iter_records(stream):
+    """Yield each record in ``stream``, or a RecordError in its place when it is malformed."""
+    chunks = _chunks(stream)
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        stripped = buffer.lstrip()
+        if stripped:
+            buffer = stripped
+            break
+    else:
+        return
+
+    if buffer.startswith('['):
+        yield from _iter_json_array(buffer[1:], chunks)
+    else:
+        yield from _iter_ndjson(buffer, chunks)
+
+
+def _iter_ndjson(buffer, chunks):
+    def parse(line):
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            return RecordError(f"Invalid JSON: {e}")
+
+    while True:
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            if line.strip():
+                yield parse(line)
+        if len(buffer) > MAX_RECORD_SIZE:
+            yield RecordError(f"Record exceeds {MAX_RECORD_SIZE} bytes")
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            break
+        buffer += chunk
+    if buffer.strip():
+        yield parse(buffer)
+
+
+def _iter_json_array(buffer, chunks):
+    decoder = json.JSONDecoder()
+    position = 0
+    exhausted = False
+
+    while True:
+        # Skip separators between elements
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except ValueError as e:
+            if exhausted:
+                if buffer[position:].strip():
+                    yield RecordError(f"Invalid JSON: {e}")
+                return
+            # Most likely the element continues in the next chunk
+            buffer = buffer[position:]
+            if len(buffer) > MAX_RECORD_SIZE:
+                # A broken array cannot be resynchronised; stop instead of buffering the rest
+                yield RecordError(f"Invalid JSON or record exceeds {MAX_RECORD_SIZE} bytes")
+                return
+            position = 0
+            chunk = next(chunks, None)
+            if chunk is None:
+                exhausted = True
+            else:
+                buffer += chunk
+            continue
+
+        yield record
+        buffer = buffer[end:]
+        position = 0
+
+
+def batched(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
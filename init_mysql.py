@@ -40,8 +40,10 @@ def create_database():
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS user (
                     id INT AUTO_INCREMENT PRIMARY KEY,
-                    username VARCHAR(80) UNIQUE NOT NULL,
-                    email VARCHAR(120) UNIQUE NOT NULL,
+                    username VARCHAR(80) NOT NULL,
+                    email VARCHAR(120) NOT NULL,
+                    username_normalized VARCHAR(80) NOT NULL,
+                    email_normalized VARCHAR(120) NOT NULL,
                     password_hash VARCHAR(255) NOT NULL,
                     user_type VARCHAR(20) NOT NULL,
                     first_name VARCHAR(50),
@@ -54,7 +56,11 @@ def create_database():
                     is_verified BOOLEAN DEFAULT FALSE,
                     requires_password_reset BOOLEAN DEFAULT FALSE,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    created_by INT
+                    created_by INT,
+                    CONSTRAINT uq_user_username_normalized UNIQUE (username_normalized),
+                    CONSTRAINT uq_user_email_normalized UNIQUE (email_normalized),
+                    INDEX ix_user_user_type (user_type),
+                    INDEX ix_user_institute (institute)
                 )
             """)
             print("User table created successfully")
@@ -65,10 +71,10 @@ def create_database():
             
             cursor.execute("""
                 INSERT INTO user (
-                    username, email, password_hash, user_type, 
+                    username, email, username_normalized, email_normalized, password_hash, user_type, 
                     first_name, last_name, is_active, is_verified
                 ) VALUES (
-                    'admin', 'admin@example.com', %s, 'super_admin',
+                    'admin', 'admin@example.com', 'admin', 'admin@example.com', %s, 'super_admin',
                     'Super', 'Admin', 1, 1
                 )
             """, (password_hash,))
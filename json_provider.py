@@ -0,0 +1,80 @@
+"""JSON provider for ``app.json``: orjson when it is installed, the stdlib otherwise.
+
+Both paths encode the same way. Datetimes become ISO 8601 strings, not
+Flask's default HTTP dates, and SQLAlchemy ``Row`` objects become objects
+keyed by column label. Views can therefore hand query rows straight to
+``jsonify`` without building a dict per row.
+
+Output is compact UTF-8 (non-ASCII is not escaped) with sorted keys on both
+paths, so ETags over a body do not depend on which one ran. Named tuples are
+arrays, as in the stdlib. One known difference: floats that need an exponent
+are written ``1e-7`` by orjson and ``1e-07`` by the stdlib.
+"""
+import dataclasses
+import decimal
+import enum
+import json
+import uuid
+from datetime import date, datetime
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, tuple):  # tuple subclasses such as named tuples; the stdlib never asks
+        return list(o)
+    if hasattr(o, '_asdict'):  # sqlalchemy Row
+        return o._asdict()
+    if isinstance(o, enum.Enum):
+        return o.value
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+    ensure_ascii = False  # orjson always writes UTF-8
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or kwargs:
+            kwargs.setdefault('default', self.default)
+            kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+            kwargs.setdefault('sort_keys', self.sort_keys)
+            if 'indent' not in kwargs:
+                kwargs.setdefault('separators', (',', ':'))
+            return json.dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self._orjson_options()).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return json.loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        # orjson produces bytes; hand them to the response without a str round-trip
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent)) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
@@ -0,0 +1,349 @@
+"""Per-route latency, status and SQL metrics in Prometheus text format.
+
+Every Flask view is timed and every SQL statement executed during a request
+is counted against that request's endpoint. Each worker process keeps its
+own counters and periodically writes a snapshot to ``METRICS_DIR``; the
+``/metrics`` endpoint sums the snapshots of all processes, so a scrape that
+lands on any worker reports totals for the whole host.
+
+Snapshots of processes that have exited (recycled workers, CLI commands)
+are folded into one ``retired.json`` on the next scrape and deleted, so the
+directory holds one file per live process plus that aggregate. Liveness is
+checked from the pid in the file name, which is why ``METRICS_DIR`` must be
+local to the host.
+
+Requests slower than ``SLOW_REQUEST_MS`` are logged together with the SQL
+they ran.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: snapshots are summed but never compacted
+    fcntl = None
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+POOL_WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+MAX_SLOW_STATEMENTS = 50
+RETIRED = 'retired.json'
+
+HELP = {
+    'http_requests_total': ('counter', 'Requests by endpoint, method and status code.'),
+    'http_request_duration_seconds': ('histogram', 'Time spent in the view until the response was ready.'),
+    'db_statements_per_request': ('histogram', 'SQL statements executed per request.'),
+    'db_statements_total': ('counter', 'SQL statements executed, by endpoint.'),
+    'db_statement_seconds_total': ('counter', 'Time spent executing SQL, by endpoint.'),
+    'db_pool_wait_seconds': ('histogram', 'Time waited to check a connection out of the pool.'),
+}
+
+
+class MetricsStore:
+    """Counters and histograms for one process, keyed by metric name and label tuple."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.extra_counters = []  # callables returning {(name, labels): value}
+
+    def inc(self, name, labels, value=1):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name, labels, value, buckets):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = {'buckets': list(buckets), 'counts': [0] * len(buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(histogram['buckets']):
+                if value <= bound:
+                    histogram['counts'][i] += 1
+                    break
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        with self._lock:
+            counters = {name: {json.dumps(labels): value for labels, value in series.items()}
+                        for name, series in self.counters.items()}
+            histograms = {name: {json.dumps(labels): dict(h, counts=list(h['counts'])) for labels, h in series.items()}
+                          for name, series in self.histograms.items()}
+        for collect in self.extra_counters:
+            for (name, labels), value in collect().items():
+                counters.setdefault(name, {})[json.dumps(labels)] = value
+        return {'counters': counters, 'histograms': histograms}
+
+
+class Metrics:
+    def __init__(self):
+        self.store = MetricsStore()
+        self.directory = None
+        self.flush_interval = 1.0
+        self.slow_request_ms = None
+        self._snapshot_path = None
+        self._snapshot_pid = None
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+        self.gauges = []  # callables returning {(name, labels): value}, read at scrape time
+
+    def describe(self, name, kind, help_text):
+        HELP[name] = (kind, help_text)
+
+    def add_counters(self, collect):
+        """Register a callable returning ``{(name, labels): value}`` for counters kept elsewhere."""
+        self.store.extra_counters.append(collect)
+
+    def add_gauges(self, collect):
+        """Register a callable returning ``{(name, labels): value}`` for host-wide gauges.
+
+        Unlike counters these are not summed across processes: the process
+        answering the scrape evaluates them, so they should read state every
+        worker shares (a file, the database).
+        """
+        self.gauges.append(collect)
+
+    def init_app(self, app, pool_wait_stats=None):
+        self.directory = app.config['METRICS_DIR']
+        self.flush_interval = app.config['METRICS_FLUSH_INTERVAL']
+        self.slow_request_ms = app.config['SLOW_REQUEST_MS']
+        os.makedirs(self.directory, exist_ok=True)
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        if pool_wait_stats is not None:
+            pool_wait_stats.listeners.append(
+                lambda seconds: self.store.observe('db_pool_wait_seconds', (), seconds, POOL_WAIT_BUCKETS))
+        atexit.register(self.flush)
+
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def _path(self):
+        # One file per process lifetime; the random suffix guards against pid reuse
+        if self._snapshot_pid != os.getpid():
+            self._snapshot_pid = os.getpid()
+            self._snapshot_path = os.path.join(self.directory, f'{os.getpid()}-{uuid.uuid4().hex[:8]}.json')
+        return self._snapshot_path
+
+    def flush(self, blocking=True):
+        if self.directory is None:
+            return
+        # Request threads pass blocking=False: if another thread is already
+        # writing the snapshot there is nothing left for them to do
+        if not self._flush_lock.acquire(blocking=blocking):
+            return
+        try:
+            path = self._path()
+            temp_path = f'{path}.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(self.store.snapshot(), f)
+            os.replace(temp_path, path)
+            self._last_flush = time.monotonic()
+        finally:
+            self._flush_lock.release()
+
+    def _before_request(self):
+        g.metrics_start = time.perf_counter()
+        g.sql_count = 0
+        g.sql_seconds = 0.0
+        g.sql_statements = []
+
+    def _after_request(self, response):
+        if 'metrics_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_start
+        endpoint = request.endpoint or 'unmatched'
+        store = self.store
+
+        store.inc('http_requests_total', (('endpoint', endpoint), ('method', request.method),
+                                          ('status', str(response.status_code))))
+        store.observe('http_request_duration_seconds', (('endpoint', endpoint),), elapsed, LATENCY_BUCKETS)
+        store.observe('db_statements_per_request', (('endpoint', endpoint),), g.sql_count, STATEMENT_BUCKETS)
+        if g.sql_count:
+            store.inc('db_statements_total', (('endpoint', endpoint),), g.sql_count)
+            store.inc('db_statement_seconds_total', (('endpoint', endpoint),), g.sql_seconds)
+
+        if self.slow_request_ms is not None and elapsed * 1000 >= self.slow_request_ms:
+            logger.warning("Slow request", extra={
+                'endpoint': endpoint,
+                'method': request.method,
+                'status': response.status_code,
+                'duration_ms': round(elapsed * 1000, 3),
+                'sql_count': g.sql_count,
+                'sql_ms': round(g.sql_seconds * 1000, 3),
+                'sql': g.sql_statements
+            })
+
+        self.flush_if_due()
+        return response
+
+    def flush_if_due(self):
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush(blocking=False)
+
+    def _read(self, name):
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def compact(self):
+        """Fold the snapshots of exited processes into ``retired.json`` and delete them."""
+        if fcntl is None:
+            return
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            names = set(os.listdir(self.directory))
+            retired = self._read(RETIRED) or {'counters': {}, 'histograms': {}, 'merged': []}
+            # A crash between writing the aggregate and deleting its inputs
+            # leaves them behind; 'merged' keeps them from being counted twice
+            merged = [name for name in retired['merged'] if name in names]
+            dead = [name for name in names
+                    if name.endswith('.json') and name != RETIRED and not _process_alive(name)]
+            folded = False
+            for name in dead:
+                if name in merged:
+                    continue
+                snapshot = self._read(name)
+                if snapshot is not None:
+                    _merge(retired, snapshot)
+                merged.append(name)
+                folded = True
+            if folded or merged != retired['merged']:
+                retired['merged'] = merged
+                temp_path = os.path.join(self.directory, f'{RETIRED}.tmp')
+                with open(temp_path, 'w') as f:
+                    json.dump(retired, f)
+                os.replace(temp_path, os.path.join(self.directory, RETIRED))
+            for name in dead:
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+    def collect(self):
+        """Sum the snapshots of every process into one exposition-ready structure."""
+        self.flush()
+        self.compact()
+        totals = {'counters': {}, 'histograms': {}}
+        retired = self._read(RETIRED)
+        skip = set(retired['merged']) if retired else set()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json') or name in skip:
+                continue
+            snapshot = retired if name == RETIRED else self._read(name)
+            if snapshot is not None:
+                _merge(totals, snapshot)
+        return totals['counters'], totals['histograms']
+
+    def render(self):
+        counters, histograms = self.collect()
+        gauges = {}
+        for collect in self.gauges:
+            for (name, labels), value in collect().items():
+                gauges.setdefault(name, {})[json.dumps(labels)] = value
+        lines = []
+        for metric in sorted(set(counters) | set(histograms) | set(gauges)):
+            kind, help_text = HELP.get(metric, ('gauge' if metric in gauges else
+                                                'counter' if metric in counters else 'histogram', metric))
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for labels, value in sorted({**counters.get(metric, {}), **gauges.get(metric, {})}.items()):
+                lines.append(f'{metric}{_labels(json.loads(labels))} {_number(value)}')
+            for labels, h in sorted(histograms.get(metric, {}).items()):
+                label_pairs = json.loads(labels)
+                cumulative = 0
+                for bound, count in zip(h['buckets'], h['counts']):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{_labels(label_pairs + [["le", _number(bound)]])} {cumulative}')
+                lines.append(f'{metric}_bucket{_labels(label_pairs + [["le", "+Inf"]])} {h["count"]}')
+                lines.append(f'{metric}_sum{_labels(label_pairs)} {_number(h["sum"])}')
+                lines.append(f'{metric}_count{_labels(label_pairs)} {h["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+def _merge(totals, snapshot):
+    """Add one snapshot's counters and histograms into ``totals``."""
+    for metric, series in snapshot['counters'].items():
+        merged = totals['counters'].setdefault(metric, {})
+        for labels, value in series.items():
+            merged[labels] = merged.get(labels, 0) + value
+    for metric, series in snapshot['histograms'].items():
+        merged = totals['histograms'].setdefault(metric, {})
+        for labels, h in series.items():
+            if labels not in merged:
+                merged[labels] = dict(h, counts=list(h['counts']))
+            else:
+                target = merged[labels]
+                target['counts'] = [a + b for a, b in zip(target['counts'], h['counts'])]
+                target['sum'] += h['sum']
+                target['count'] += h['count']
+
+
+def _process_alive(name):
+    """Whether the process that wrote snapshot ``<pid>-<suffix>.json`` is still running."""
+    try:
+        pid = int(name.split('-', 1)[0])
+    except ValueError:
+        return True  # not a snapshot of ours; leave it alone
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for key, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if not has_request_context() or 'sql_statements' not in g:
+        return
+    g.sql_count += 1
+    g.sql_seconds += elapsed
+    if len(g.sql_statements) < MAX_SLOW_STATEMENTS:
+        g.sql_statements.append({'sql': ' '.join(statement.split()), 'ms': round(elapsed * 1000, 3)})
+
+
+metrics = Metrics()
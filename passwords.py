@@ -0,0 +1,136 @@
+"""Password hashing on a bounded process pool.
+
+werkzeug's scrypt/pbkdf2 hashes are deliberately CPU-heavy. Running them on
+the request thread lets a burst of logins or signups saturate every worker,
+and threads alone cannot spread them across cores because of the GIL. The
+hasher here sends them to a process pool instead, admits only a bounded
+number of in-flight jobs and gives up after a timeout so callers can answer
+with 503 rather than piling up.
+
+When every slot is taken, a caller waits up to ``queue_wait`` seconds for
+one to free up, which absorbs a short burst, and is refused after that.
+Inline hashing (no pool) is capped the same way, at one hash per CPU.
+
+Batch hashing (account imports) goes through the same slots with at most
+one hash per pool worker in flight, so a login arriving mid-import queues
+behind a handful of import hashes, not the whole file. A batch waits up to
+``timeout`` for each slot instead of ``queue_wait``, since nobody is
+waiting on it interactively.
+"""
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time."""
+
+
+class PasswordHasher:
+    def __init__(self, method='scrypt', workers=0, queue_size=32, timeout=5.0, queue_wait=0.5):
+        """``workers=0`` hashes inline on the calling thread (no pool)."""
+        self.method = method
+        self.workers = workers
+        self.timeout = timeout
+        self.queue_wait = queue_wait
+        self._slots = threading.BoundedSemaphore(workers + queue_size if workers else os.cpu_count() or 1)
+        self.rejected = 0
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+        self._hash_prefix = None
+
+    def _get_executor(self):
+        # A pool inherited across fork() is unusable, so each worker process
+        # (e.g. every gunicorn worker) lazily builds its own
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _acquire(self, wait=None):
+        if not self._slots.acquire(timeout=self.queue_wait if wait is None else wait):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy('Password hashing queue is full')
+
+    def _submit(self, fn, *args, wait=None):
+        """Take a slot and start ``fn`` on the pool; the slot is freed when it finishes."""
+        self._acquire(wait)
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy('Password hashing timed out')
+
+    def _run(self, fn, *args, wait=None):
+        if not self.workers:
+            self._acquire(wait)
+            try:
+                return fn(*args)
+            finally:
+                self._slots.release()
+        return self._result(self._submit(fn, *args, wait=wait))
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def hash_many(self, passwords):
+        """Hash a batch of passwords across the pool, preserving order.
+
+        Raises ``PasswordHasherBusy`` when a slot stays taken for ``timeout``.
+        """
+        if not self.workers:
+            return [self._run(generate_password_hash, password, self.method, wait=self.timeout)
+                    for password in passwords]
+        hashes = []
+        pending = deque()
+        try:
+            for password in passwords:
+                if len(pending) >= self.workers:
+                    hashes.append(self._result(pending.popleft()))
+                pending.append(self._submit(generate_password_hash, password, self.method, wait=self.timeout))
+            while pending:
+                hashes.append(self._result(pending.popleft()))
+        finally:
+            for future in pending:
+                future.cancel()
+        return hashes
+
+    @property
+    def hash_prefix(self):
+        # werkzeug expands shorthand like 'scrypt' to 'scrypt:32768:8:1' in the
+        # stored hash, so learn the canonical prefix from a throwaway hash once
+        if self._hash_prefix is None:
+            self._hash_prefix = generate_password_hash('', self.method).split('$', 1)[0]
+        return self._hash_prefix
+
+    def needs_rehash(self, password_hash):
+        """True when ``password_hash`` was made with other parameters than ours."""
+        return password_hash.split('$', 1)[0] != self.hash_prefix
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
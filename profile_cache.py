@@ -0,0 +1,71 @@
+"""Per-process LRU cache of serialized user profiles.
+
+Entries expire after a TTL and are invalidated across worker processes
+through a shared VersionTable: writers bump the user's slot after commit and
+every process compares the slot against the version its entry was filled at.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ProfileCache:
+    def __init__(self, versions, max_entries=10000, ttl=300):
+        self.versions = versions
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get_or_load(self, user_id, loader):
+        """Return the cached profile for ``user_id``, calling ``loader()`` on a miss.
+
+        ``loader`` returns the serialized profile, or None when the user does
+        not exist (which is not cached).
+        """
+        # Read the version before loading so a write that lands while we are
+        # querying leaves this entry already stale
+        version = self.versions.get(user_id)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version and entry[1] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        profile = loader()
+        if profile is None:
+            return None
+
+        with self._lock:
+            self._entries[user_id] = (version, now + self.ttl, profile)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return profile
+
+    def invalidate(self, user_id):
+        """Drop ``user_id`` here and, via its version slot, in every other process."""
+        self.versions.bump(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0
+            }
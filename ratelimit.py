@@ -0,0 +1,74 @@
+"""Per-client rate limits for the endpoints that hash passwords.
+
+Login and signup are the cheapest way to make this server burn CPU: every
+request runs scrypt/pbkdf2. Each protected request spends a token from two
+buckets, one for the client address and one for the username it names, so
+one address cannot spray many accounts and many addresses cannot hammer one
+account. Buckets live in a memory-mapped ``TokenBuckets`` file under
+``LOCAL_STATE_DIR``, so the limit holds across all workers on the host.
+
+A request over either limit gets 429 with ``Retry-After`` before any hashing
+happens. Whatever gets through is still bounded by the password hasher's own
+in-flight cap (see ``passwords.py``).
+
+Behind a reverse proxy, set ``TRUSTED_PROXIES`` so the client address comes
+from ``X-Forwarded-For`` rather than being the proxy's for every request.
+"""
+import functools
+import math
+import threading
+
+from flask import jsonify, request
+
+
+class RateLimiter:
+    def __init__(self, buckets, ip_per_minute=30, ip_burst=20, user_per_minute=10, user_burst=5, enabled=True):
+        """A ``*_per_minute`` of 0 disables that bucket."""
+        self.buckets = buckets
+        self.ip_limit = (ip_per_minute / 60.0, ip_burst)
+        self.user_limit = (user_per_minute / 60.0, user_burst)
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.rejected = {}  # (scope, reason) -> count
+
+    def _reject(self, scope, reason, wait):
+        with self._lock:
+            self.rejected[(scope, reason)] = self.rejected.get((scope, reason), 0) + 1
+        return jsonify({
+            'status': 'error',
+            'message': 'Too many attempts, please try again later'
+        }), 429, {'Retry-After': str(max(1, math.ceil(wait)))}
+
+    def check(self, scope):
+        """Spend this request's tokens; return a 429 response when it is over a limit, else None."""
+        rate, burst = self.ip_limit
+        if rate:
+            wait = self.buckets.take(f'{scope}:ip:{request.remote_addr}', rate, burst)
+            if wait:
+                return self._reject(scope, 'ip', wait)
+
+        rate, burst = self.user_limit
+        data = request.get_json(silent=True)
+        username = data.get('username') if isinstance(data, dict) else None
+        if rate and isinstance(username, str) and username.strip():
+            wait = self.buckets.take(f'{scope}:user:{username.strip().lower()}', rate, burst)
+            if wait:
+                return self._reject(scope, 'username', wait)
+        return None
+
+    def limit(self, scope):
+        """Decorate a view so it is rate limited under ``scope`` (e.g. 'login', 'register')."""
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.enabled:
+                    rejected = self.check(scope)
+                    if rejected is not None:
+                        return rejected
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._lock:
+            return dict(self.rejected)
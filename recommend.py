@@ -0,0 +1,208 @@
+"""Content-based job recommendations for students.
+
+Every active job is kept as a TF-IDF style term vector over its position and
+requirements. The vectors live in NumPy arrays in ELLPACK layout: row ``r``
+holds up to ``max_terms`` (term id, weight) pairs, zero-padded, and only
+the columns some job actually uses are scanned. A student's interests form
+one dense query vector over the vocabulary, so scoring every job is a gather
+plus a row-wise dot product, done in fixed-size blocks of rows, and the top
+k come from ``argpartition``. Over 50k jobs that takes a few milliseconds.
+
+Stored weights are sublinear term frequencies normalized per job. IDF is not
+baked in. It is applied to the query at scoring time from live document
+frequencies, so adding or closing a job never forces a rebuild of other
+rows.
+
+Each worker process keeps its own matcher. The worker that creates or
+closes a job updates its copy directly. The others notice the job board
+version move and catch up by diffing active job ids: they load text only
+for jobs they have not seen and drop rows for jobs that closed.
+"""
+import math
+import threading
+from collections import Counter
+
+import numpy as np
+
+from search import search_terms
+
+STOP_WORDS = frozenset("""
+a an and are as at be by for from in into is it of on or our the to with you your we will
+""".split())
+
+
+def term_counts(text, weight=1.0, counts=None):
+    counts = Counter() if counts is None else counts
+    for term in search_terms(text or ''):
+        if term not in STOP_WORDS:
+            counts[term] += weight
+    return counts
+
+
+def normalized(counts):
+    """Sublinear tf, scaled to unit length."""
+    weights = {term: 1.0 + math.log(count) for term, count in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {term: w / norm for term, w in weights.items()}
+
+
+class JobMatcher:
+    def __init__(self, max_terms=32, position_weight=2.0, block_rows=16384):
+        self.max_terms = max_terms
+        self.position_weight = position_weight
+        self.block_rows = block_rows
+        self._lock = threading.RLock()
+        self._clear()
+        self.generation = None  # see sync()
+
+    def _clear(self):
+        self.vocab = {}
+        self.df = np.zeros(1024, dtype=np.int32)
+        self.terms = np.zeros((1024, self.max_terms), dtype=np.int32)
+        self.weights = np.zeros((1024, self.max_terms), dtype=np.float32)
+        self.job_ids = np.zeros(1024, dtype=np.int64)
+        self.active = np.zeros(1024, dtype=bool)
+        self.rows = {}  # job id -> row
+        self._free = []
+        self._used = 0
+        self._width = 1  # widest row so far; columns past it are all padding
+        self.version = None  # job board version the matcher reflects, see sync()
+
+    def job_vector(self, position, requirements):
+        """Position terms count ``position_weight`` times a requirements term."""
+        counts = term_counts(position, self.position_weight)
+        return normalized(term_counts(requirements, counts=counts))
+
+    def _term_id(self, term):
+        term_id = self.vocab.get(term)
+        if term_id is None:
+            term_id = self.vocab[term] = len(self.vocab)
+            if term_id >= len(self.df):
+                self.df = np.concatenate([self.df, np.zeros_like(self.df)])
+        return term_id
+
+    def _grow(self):
+        size = len(self.job_ids) * 2
+        self.terms = np.resize(self.terms, (size, self.max_terms))
+        self.weights = np.resize(self.weights, (size, self.max_terms))
+        self.job_ids = np.resize(self.job_ids, size)
+        self.active = np.resize(self.active, size)
+        self.terms[self._used:] = 0
+        self.weights[self._used:] = 0
+        self.active[self._used:] = False
+
+    def _idf(self):
+        count = len(self.rows)
+        return np.log((1.0 + count) / (1.0 + self.df[:len(self.vocab)])) + 1.0
+
+    def add(self, job_id, position, requirements, version=None):
+        """Index one active job. Pass the version returned by the board's bump
+        to mark the matcher current when this was the only change."""
+        vector = self.job_vector(position, requirements)
+        with self._lock:
+            if job_id in self.rows:
+                self._remove(job_id)
+            if len(vector) > self.max_terms:
+                # Long postings keep their most frequent terms
+                vector = dict(sorted(vector.items(), key=lambda item: item[1], reverse=True)[:self.max_terms])
+            if self._free:
+                row = self._free.pop()
+            else:
+                if self._used == len(self.job_ids):
+                    self._grow()
+                row = self._used
+                self._used += 1
+            ids = [self._term_id(term) for term in vector]
+            self._width = max(self._width, len(ids))
+            self.terms[row, :len(ids)] = ids
+            self.weights[row, :len(ids)] = list(vector.values())
+            np.add.at(self.df, ids, 1)
+            self.job_ids[row] = job_id
+            self.active[row] = True
+            self.rows[job_id] = row
+            self._advance(version)
+
+    def remove(self, job_id, version=None):
+        """Drop a job that closed or was deleted."""
+        with self._lock:
+            if job_id in self.rows:
+                self._remove(job_id)
+            self._advance(version)
+
+    def _remove(self, job_id):
+        row = self.rows.pop(job_id)
+        ids = self.terms[row][self.weights[row] > 0]
+        np.subtract.at(self.df, ids, 1)
+        self.terms[row] = 0
+        self.weights[row] = 0
+        self.active[row] = False
+        self._free.append(row)
+
+    def _advance(self, version):
+        if version is not None and self.version == version - 1:
+            self.version = version
+
+    def sync(self, version, load_active_ids, load_texts, generation=None):
+        """Bring the matcher up to ``version`` of the job board.
+
+        ``load_active_ids()`` returns every active job id; ``load_texts(ids)``
+        yields ``(id, position, requirements)`` for the given ids. Read
+        ``version`` before calling so a write racing the load is caught by
+        the next sync. A new ``generation`` means job ids may have been
+        reused (the database was reset), so every row is reloaded.
+        """
+        with self._lock:
+            if generation != self.generation:
+                self._clear()
+                self.generation = generation
+            if self.version == version:
+                return
+            active = set(load_active_ids())
+            for job_id in set(self.rows) - active:
+                self._remove(job_id)
+            missing = active.difference(self.rows)
+            if missing:
+                for job_id, position, requirements in load_texts(sorted(missing)):
+                    self.add(job_id, position, requirements)
+            self.version = version
+
+    def query_vector(self, documents, weights=None):
+        """One dense, IDF-weighted query over the vocabulary from ``(position, requirements)`` pairs."""
+        with self._lock:
+            query = np.zeros(len(self.vocab), dtype=np.float32)
+            for i, (position, requirements) in enumerate(documents):
+                weight = weights[i] if weights else 1.0
+                for term, value in self.job_vector(position, requirements).items():
+                    term_id = self.vocab.get(term)
+                    if term_id is not None:
+                        query[term_id] += weight * value
+            if not query.any():
+                return None
+            idf = self._idf().astype(np.float32)
+            return query * idf * idf
+
+    def top(self, query, k, exclude=()):
+        """Return up to ``k`` ``(job_id, score)`` pairs, best first, skipping ``exclude``."""
+        with self._lock:
+            used = self._used
+            if query is None or not used:
+                return []
+            if len(query) < len(self.vocab):  # terms added since the query was built
+                query = np.pad(query, (0, len(self.vocab) - len(query)))
+            scores = np.empty(used, dtype=np.float32)
+            for start in range(0, used, self.block_rows):
+                stop = min(start + self.block_rows, used)
+                terms = self.terms[start:stop, :self._width]
+                scores[start:stop] = np.einsum('ij,ij->i', query.take(terms), self.weights[start:stop, :self._width])
+            scores[~self.active[:used]] = -1.0
+            excluded = [self.rows[job_id] for job_id in exclude if job_id in self.rows]
+            if excluded:
+                scores[excluded] = -1.0
+            k = min(k, used)
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.lexsort((-self.job_ids[best], -scores[best]))]
+            return [(int(self.job_ids[row]), float(scores[row])) for row in best if scores[row] > 0]
+
+    def stats(self):
+        with self._lock:
+            return {'jobs': len(self.rows), 'terms': len(self.vocab), 'rows': self._used, 'version': self.version}
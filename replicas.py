@@ -0,0 +1,203 @@
+"""Read-replica routing for read-only requests.
+
+With ``DATABASE_REPLICA_URLS`` set, the router opens an engine per replica
+(``replica0``, ``replica1``, ...) with the same pool settings as the
+primary. They are not Flask-SQLAlchemy binds, so ``create_all`` and
+``drop_all`` never touch a replica. The first statement of a GET or HEAD request picks one replica
+round-robin, and the session sends the rest of that request's SELECTs (ORM
+queries, Core selects, text SQL) to it too. Flushes and INSERT/UPDATE/DELETE
+statements always go to the primary, as does every other HTTP method and
+anything run outside a request (CLI commands, init_db).
+
+Ejection: a replica whose connection fails (disconnect or OperationalError)
+is skipped for ``DB_REPLICA_EJECT_SECONDS``; the request that hit the
+failure still gets its error. After that, one request probes it with
+``SELECT 1`` before it rejoins the rotation. With every replica out, reads
+fall back to the primary.
+
+Versioned reads: a result stored under a version stamp (the shared job
+listing cache, the profile cache, the job matcher) must not come from a
+replica that may not have the write behind that version yet; the lagging
+result would be kept as current long after the replica caught up. Those
+loaders run inside ``replica_router.settled(modified)``, which reads from the
+primary only while that version is younger than ``DB_READ_YOUR_WRITES_SECONDS``
+(the lag replicas are assumed to stay within) and from a replica after that.
+
+Read-your-writes: a successful write request from a signed-in user stamps a
+shared ``VersionTable`` slot for them (``note_write`` does the same for writes
+made before there is a token, such as signup). Their reads stay on the primary for the next
+``DB_READ_YOUR_WRITES_SECONDS``, so a change shows up in the very next page
+load even while replicas lag.
+
+Local testing with two SQLite files: copy the primary (``sqlite3 app.db
+".backup replica.db"``) and set
+``DATABASE_REPLICA_URLS=sqlite:///replica.db``. Nothing replicates between
+them, which makes it easy to see which database answered.
+"""
+import itertools
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.sql.dml import UpdateBase
+
+from dbpool import engine_options
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica chosen for the current request."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and not self._flushing and not isinstance(clause, UpdateBase)
+                and has_request_context()):
+            router = current_app.extensions.get('replica_router')
+            key = router.read_bind() if router is not None else None
+            if key is not None:
+                return router.engines[key]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    def __init__(self, app=None, recent_writes=None):
+        self.recent_writes = recent_writes
+        self.engines = {}
+        self.keys = []
+        self.eject_seconds = 30.0
+        self.sticky_seconds = 5.0
+        self._lock = threading.Lock()
+        self._turn = itertools.count()
+        self._ejected = {}  # key -> time it may be probed again
+        self._probing = set()
+        self.routed = {}  # target -> reads routed there
+        self.ejections = {}  # key -> times ejected
+        if app is not None:
+            self.init_app(app, recent_writes)
+
+    def init_app(self, app, recent_writes):
+        self.recent_writes = recent_writes
+        self.eject_seconds = app.config['DB_REPLICA_EJECT_SECONDS']
+        self.sticky_seconds = app.config['DB_READ_YOUR_WRITES_SECONDS']
+        for i, url in enumerate(app.config['DATABASE_REPLICA_URLS']):
+            engine = self.engines[f'replica{i}'] = create_engine(url, **engine_options(url))
+            event.listen(engine, 'handle_error', self._error_listener(f'replica{i}'))
+        self.keys = list(self.engines)
+        if not self.keys:
+            return
+        app.extensions['replica_router'] = self
+        app.after_request(self.record_write)
+
+    def _error_listener(self, key):
+        def on_error(context):
+            if context.is_disconnect or isinstance(context.original_exception,
+                                                   context.dialect.loaded_dbapi.OperationalError):
+                self.eject(key)
+        return on_error
+
+    def eject(self, key):
+        with self._lock:
+            self._ejected[key] = time.monotonic() + self.eject_seconds
+            self.ejections[key] = self.ejections.get(key, 0) + 1
+
+    def _probe(self, key):
+        """Let one caller test an ejected replica once its ejection has run out."""
+        with self._lock:
+            if key in self._probing or self._ejected.get(key, 0) > time.monotonic():
+                return False
+            self._probing.add(key)
+        try:
+            with self.engines[key].connect() as connection:
+                connection.execute(text('SELECT 1'))
+        except Exception:
+            self.eject(key)
+            return False
+        finally:
+            with self._lock:
+                self._probing.discard(key)
+        with self._lock:
+            self._ejected.pop(key, None)
+        return True
+
+    def choose(self):
+        """Return the next healthy replica's bind key, or None to read from the primary."""
+        start = next(self._turn)
+        for offset in range(len(self.keys)):
+            key = self.keys[(start + offset) % len(self.keys)]
+            if key not in self._ejected or self._probe(key):
+                return key
+        return None
+
+    def _count(self, target):
+        with self._lock:
+            self.routed[target] = self.routed.get(target, 0) + 1
+
+    def _user_key(self):
+        try:
+            identity = get_jwt_identity()
+        except RuntimeError:  # no token was verified for this request
+            return None
+        return f"user:{identity['user_id']}" if isinstance(identity, dict) and 'user_id' in identity else None
+
+    def read_bind(self):
+        """The replica bind key for this request's reads, or None for the primary; decided once per request."""
+        if g.get('db_primary_depth'):
+            return None
+        if 'db_read_bind' in g:
+            return g.db_read_bind
+        key = None
+        if request.method in READ_METHODS:
+            user_key = self._user_key()
+            if user_key and time.time() - self.recent_writes.last_modified(user_key) < self.sticky_seconds:
+                self._count('primary:recent_write')
+            else:
+                key = self.choose()
+                self._count(key or 'primary:no_replica')
+        g.db_read_bind = key
+        return key
+
+    @contextmanager
+    def primary(self):
+        """Send this request's reads inside the block to the primary."""
+        if not has_request_context():
+            yield
+            return
+        depth = g.get('db_primary_depth', 0)
+        g.db_primary_depth = depth + 1
+        try:
+            yield
+        finally:
+            g.db_primary_depth = depth
+
+    def settled(self, modified):
+        """Reads for a result stored under a version last bumped at ``modified`` (epoch seconds):
+        on the primary while the write behind it may not have replicated, else as usual."""
+        if self.keys and time.time() - modified < self.sticky_seconds:
+            return self.primary()
+        return nullcontext()
+
+    def note_write(self, user_id):
+        """Keep ``user_id``'s reads on the primary for the read-your-writes window."""
+        if self.keys:
+            self.recent_writes.bump(f'user:{user_id}')
+
+    def record_write(self, response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            user_key = self._user_key()
+            if user_key:
+                self.recent_writes.bump(user_key)
+        return response
+
+    def status(self):
+        now = time.monotonic()
+        with self._lock:
+            return {key: {'ejected': self._ejected.get(key, 0) > now, 'ejections': self.ejections.get(key, 0)}
+                    for key in self.keys}
+
+    def stats(self):
+        with self._lock:
+            return dict(self.routed), dict(self.ejections)
@@ -0,0 +1,189 @@
+"""Serialized response bodies shared by every worker process on one host.
+
+Entries live in a small SQLite file next to the other local state and are
+stored under the current stamp (epoch and version) of a VersionTable slot.
+Once a writer bumps that slot, no reader asks for the old stamp again, and
+entries with any other stamp are deleted the next time a fresh one is stored.
+
+Bounds: an entry is served for at most ``ttl`` seconds, and storing one
+evicts expired entries and the oldest beyond ``max_entries``. Freed pages are
+returned to the filesystem (incremental auto-vacuum), so the file stays
+around the size of the live entries. ``ttl`` or ``max_entries`` of 0 turns
+the cache off.
+
+Single host only: the VersionTable is host-local, so a write handled on
+another host that shares the database does not change this host's stamp.
+Behind a multi-host deployment, ``ttl`` is how long such a write can stay
+invisible here; keep it short or turn the cache off.
+
+A miss is filled once. Threads of the same process wait on a striped lock,
+and other processes see a claim row in the ``fills`` table. They poll for
+the entry instead of running the same query, and take over if the claim is
+older than ``fill_timeout``. Any SQLite error degrades to calling the
+filler directly: the cache never fails a request.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL,
+    body BLOB NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS fills (
+    key TEXT PRIMARY KEY,
+    started REAL NOT NULL
+);
+"""
+POLL_INTERVAL = 0.01
+LOCK_STRIPES = 64
+
+
+class SharedResponseCache:
+    def __init__(self, path, versions, version_key, max_entries=1000, ttl=300.0, fill_timeout=2.0):
+        self.path = path
+        self.versions = versions
+        self.version_key = version_key
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fill_timeout = fill_timeout
+        self._local = threading.local()
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._evicted_stamp = None
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.errors = 0
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.fill_timeout, isolation_level=None)
+            # Losing the cache in a crash is harmless; don't pay for durability
+            connection.execute('PRAGMA auto_vacuum=INCREMENTAL')  # only takes effect on a new file
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _stamp(self):
+        version = self.versions.get(self.version_key)
+        return f'{self.versions.epoch:x}-{version}'
+
+    def _lookup(self, connection, key, stamp):
+        row = connection.execute('SELECT body FROM entries WHERE key = ? AND stamp = ? AND created > ?',
+                                 (key, stamp, time.time() - self.ttl)).fetchone()
+        return row[0] if row else None
+
+    def get_or_fill(self, key, fill):
+        """Return the cached bytes for ``key`` at the current version, calling ``fill()`` on a miss."""
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return fill()
+        stamp = self._stamp()
+        body = None
+        try:
+            connection = self._connection()
+            body = self._lookup(connection, key, stamp)
+            if body is not None:
+                self.hits += 1
+                return body
+            with self._locks[hash(key) % LOCK_STRIPES]:
+                body = self._lookup(connection, key, stamp)
+                if body is not None:
+                    self.hits += 1
+                    return body
+                self.misses += 1
+                body = self._wait_for_other_process(connection, key, stamp)
+                if body is not None:
+                    return body
+                try:
+                    body = fill()
+                    self._store(connection, key, stamp, body)
+                finally:
+                    self._release(connection, key)
+                return body
+        except sqlite3.Error:
+            self.errors += 1
+            logger.warning("Response cache unavailable, serving uncached", exc_info=True)
+            return body if body is not None else fill()
+
+    def _release(self, connection, key):
+        try:
+            connection.execute('DELETE FROM fills WHERE key = ?', (key,))
+        except sqlite3.Error:
+            pass  # the claim expires after fill_timeout anyway
+
+    def _wait_for_other_process(self, connection, key, stamp):
+        """Claim the fill for ``key``; if another process holds it, wait for its result.
+
+        Returns the other process's body, or None when this process should fill.
+        """
+        deadline = time.monotonic() + self.fill_timeout
+        while True:
+            now = time.time()
+            claimed = connection.execute(
+                'INSERT INTO fills (key, started) VALUES (?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET started = excluded.started WHERE fills.started < ?',
+                (key, now, now - self.fill_timeout)
+            ).rowcount
+            if claimed:
+                return None
+            self.waits += 1
+            time.sleep(POLL_INTERVAL)
+            body = self._lookup(connection, key, stamp)
+            if body is not None:
+                return body
+            if time.monotonic() >= deadline:
+                return None
+
+    def _store(self, connection, key, stamp, body):
+        if self._stamp() != stamp:
+            return  # already stale; nobody will ask for this version again
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.execute('INSERT OR REPLACE INTO entries (key, stamp, body, created) VALUES (?, ?, ?, ?)',
+                               (key, stamp, body, time.time()))
+            evicted = connection.execute('DELETE FROM entries WHERE created <= ?',
+                                         (time.time() - self.ttl,)).rowcount
+            if stamp != self._evicted_stamp:
+                evicted += connection.execute('DELETE FROM entries WHERE stamp != ?', (stamp,)).rowcount
+                self._evicted_stamp = stamp
+            connection.execute(
+                'DELETE FROM entries WHERE key IN '
+                '(SELECT key FROM entries ORDER BY created DESC LIMIT -1 OFFSET ?)', (self.max_entries,)
+            )
+            connection.execute('COMMIT')
+        except sqlite3.Error:
+            connection.execute('ROLLBACK')
+            raise
+        if evicted:
+            # executescript steps the pragma to completion; execute() would free a single page
+            connection.executescript('PRAGMA incremental_vacuum;')
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        try:
+            entries = self._connection().execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        except sqlite3.Error:
+            entries = None
+        return {
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'stamp': self._stamp(),
+            'hits': self.hits,
+            'misses': self.misses,
+            'waits': self.waits,
+            'errors': self.errors,
+            'hit_ratio': self.hits / lookups if lookups else 0.0
+        }
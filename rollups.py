@@ -0,0 +1,166 @@
+"""Summary tables behind the /api/stats endpoints.
+
+Dashboards read counts from small rollup tables instead of grouping
+``job_application`` and ``user`` on every load. Triggers on the source
+tables keep the rollups current in the same transaction as the write, so
+ORM writes, bulk Core inserts (job uploads, account imports, seeding) and raw
+SQL are all counted. An application contributes to the per-job, per-company
+and per-institute-and-day rollups; a status change moves its count from the
+old status to the new one.
+
+Triggers and tables are created by ``create_all`` (``IF NOT EXISTS``, so an
+existing database picks them up too); ``rebuild_rollups`` recomputes every
+count from the source tables, for backfilling or after writes that bypassed
+the triggers. Supported on SQLite and MySQL 8.0.29+, like the search index.
+"""
+from collections import namedtuple
+
+from sqlalchemy import DDL, Column, Date, Integer, String, Table, event, text
+
+NO_INSTITUTE = ''  # students without an institute; NULL cannot be part of a key
+
+RollupTables = namedtuple('RollupTables', 'by_job by_company by_institute jobs signups')
+
+APPLICATION_STATUS = "COALESCE({row}.status, 'pending')"
+APPLICATION_DAY = 'COALESCE(date({row}.date_applied), CURRENT_DATE)'
+APPLICATION_COMPANY = '(SELECT company FROM job WHERE job.id = {row}.job_id)'
+APPLICATION_INSTITUTE = f"COALESCE((SELECT institute FROM `user` WHERE `user`.id = {{row}}.student_id), '{NO_INSTITUTE}')"
+
+
+def define_rollup_tables(metadata):
+    def rollup(name, *keys):
+        return Table(name, metadata, *keys, Column('total', Integer, nullable=False, default=0))
+
+    return RollupTables(
+        by_job=rollup('stats_applications_by_job',
+                      Column('job_id', Integer, primary_key=True),
+                      Column('status', String(20), primary_key=True)),
+        by_company=rollup('stats_applications_by_company',
+                          Column('company', String(100), primary_key=True),
+                          Column('status', String(20), primary_key=True)),
+        by_institute=rollup('stats_applications_by_institute',
+                            Column('institute', String(100), primary_key=True),
+                            Column('day', Date, primary_key=True),
+                            Column('status', String(20), primary_key=True)),
+        jobs=rollup('stats_jobs',
+                    Column('company', String(100), primary_key=True),
+                    Column('status', String(20), primary_key=True)),
+        signups=rollup('stats_signups',
+                       Column('day', Date, primary_key=True),
+                       Column('user_type', String(20), primary_key=True)),
+    )
+
+
+# (rollup table, key columns, key expressions with {row} standing for new/old)
+APPLICATION_ROLLUPS = [
+    ('stats_applications_by_job', ('job_id', 'status'), ('{row}.job_id', APPLICATION_STATUS)),
+    ('stats_applications_by_company', ('company', 'status'), (APPLICATION_COMPANY, APPLICATION_STATUS)),
+    ('stats_applications_by_institute', ('institute', 'day', 'status'),
+     (APPLICATION_INSTITUTE, APPLICATION_DAY, APPLICATION_STATUS)),
+]
+JOB_ROLLUPS = [
+    ('stats_jobs', ('company', 'status'), ('{row}.company', "COALESCE({row}.status, 'active')")),
+]
+USER_ROLLUPS = [
+    ('stats_signups', ('day', 'user_type'), ('COALESCE(date({row}.created_at), CURRENT_DATE)', '{row}.user_type')),
+]
+
+# (trigger name, event, source table, status column or None, rollups)
+TRIGGERS = [
+    ('stats_job_application_ai', 'INSERT', 'job_application', None, APPLICATION_ROLLUPS),
+    ('stats_job_application_ad', 'DELETE', 'job_application', None, APPLICATION_ROLLUPS),
+    ('stats_job_application_au', 'UPDATE', 'job_application', 'status', APPLICATION_ROLLUPS),
+    ('stats_job_ai', 'INSERT', 'job', None, JOB_ROLLUPS),
+    ('stats_job_ad', 'DELETE', 'job', None, JOB_ROLLUPS),
+    ('stats_job_au', 'UPDATE', 'job', 'status', JOB_ROLLUPS),
+    ('stats_user_ai', 'INSERT', 'user', None, USER_ROLLUPS),
+    ('stats_user_ad', 'DELETE', 'user', None, USER_ROLLUPS),
+]
+
+
+def upsert(dialect, table, columns, expressions, delta):
+    names = ', '.join(columns)
+    values = ', '.join(expressions)
+    if dialect == 'mysql':
+        return (f"INSERT INTO {table} ({names}, total) VALUES ({values}, {delta}) "
+                f"ON DUPLICATE KEY UPDATE total = total + VALUES(total);")
+    return (f"INSERT INTO {table} ({names}, total) VALUES ({values}, {delta}) "
+            f"ON CONFLICT ({names}) DO UPDATE SET total = total + excluded.total;")
+
+
+def trigger_ddl(dialect, name, operation, source, status_column, rollups):
+    """One AFTER trigger that applies a row's +1/-1 to each of ``rollups``."""
+    if operation == 'INSERT':
+        changes = [('new', 1)]
+    elif operation == 'DELETE':
+        changes = [('old', -1)]
+    else:
+        changes = [('old', -1), ('new', 1)]
+    body = ' '.join(
+        upsert(dialect, table, columns, [expression.format(row=row) for expression in expressions], delta)
+        for row, delta in changes
+        for table, columns, expressions in rollups
+    )
+    if dialect == 'mysql':
+        if status_column:
+            body = f"IF NOT (old.{status_column} <=> new.{status_column}) THEN {body} END IF;"
+        return (f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {operation} ON `{source}` "
+                f"FOR EACH ROW BEGIN {body} END")
+    target = f"UPDATE OF {status_column}" if status_column else operation
+    when = f" WHEN old.{status_column} IS NOT new.{status_column}" if status_column else ''
+    return f'CREATE TRIGGER IF NOT EXISTS {name} AFTER {target} ON "{source}"{when} BEGIN {body} END'
+
+
+def install_rollups(metadata):
+    """Define the rollup tables on ``metadata`` and create their triggers with every ``create_all``."""
+    tables = define_rollup_tables(metadata)
+    for dialect in ('sqlite', 'mysql'):
+        for trigger in TRIGGERS:
+            event.listen(metadata, 'after_create', DDL(trigger_ddl(dialect, *trigger)).execute_if(dialect=dialect))
+    return tables
+
+
+BACKFILL = {
+    'stats_applications_by_job': """
+        SELECT job_id, COALESCE(status, 'pending'), COUNT(*)
+        FROM job_application GROUP BY 1, 2
+    """,
+    'stats_applications_by_company': """
+        SELECT job.company, COALESCE(job_application.status, 'pending'), COUNT(*)
+        FROM job_application JOIN job ON job.id = job_application.job_id GROUP BY 1, 2
+    """,
+    'stats_applications_by_institute': f"""
+        SELECT COALESCE(`user`.institute, '{NO_INSTITUTE}'),
+               COALESCE(date(job_application.date_applied), CURRENT_DATE),
+               COALESCE(job_application.status, 'pending'), COUNT(*)
+        FROM job_application LEFT JOIN `user` ON `user`.id = job_application.student_id GROUP BY 1, 2, 3
+    """,
+    'stats_jobs': """
+        SELECT company, COALESCE(status, 'active'), COUNT(*) FROM job GROUP BY 1, 2
+    """,
+    'stats_signups': """
+        SELECT COALESCE(date(created_at), CURRENT_DATE), user_type, COUNT(*) FROM `user` GROUP BY 1, 2
+    """,
+}
+
+
+def rebuild_rollups(session, tables):
+    """Recompute every rollup from the source tables in one transaction; returns rows per rollup."""
+    dialect = session.get_bind().dialect.name
+    if dialect not in ('sqlite', 'mysql'):
+        raise NotImplementedError(f"Rollups are not supported on {dialect}")
+
+    for table in tables:
+        table.create(session.connection(), checkfirst=True)
+    for trigger in TRIGGERS:
+        session.execute(text(trigger_ddl(dialect, *trigger)))
+
+    counts = {}
+    for table in tables:
+        columns = ', '.join(column.name for column in table.columns)
+        session.execute(table.delete())
+        session.execute(text(f"INSERT INTO {table.name} ({columns}) {BACKFILL[table.name]}"))
+        counts[table.name] = session.execute(text(f"SELECT COUNT(*) FROM {table.name}")).scalar()
+    session.commit()
+    return counts
+
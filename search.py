@@ -0,0 +1,141 @@
+"""Full-text search over job postings.
+
+On MySQL the job table carries a FULLTEXT index that InnoDB maintains on
+every write. On SQLite an external-content FTS5 table is kept in sync by
+triggers, so ORM writes, bulk Core inserts and raw SQL all update the index
+incrementally. Only active jobs are indexed; closing a job drops it out.
+"""
+import re
+
+from sqlalchemy import DDL, DateTime, Float, Integer, String, event, text
+
+MYSQL_FULLTEXT_INDEX = 'ft_job_text'
+
+SQLITE_FTS_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5(
+        company, position, requirements,
+        content='job', content_rowid='id', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job
+    WHEN new.status = 'active'
+    BEGIN
+        INSERT INTO job_fts(rowid, company, position, requirements)
+        VALUES (new.id, new.company, new.position, new.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job
+    WHEN old.status = 'active'
+    BEGIN
+        INSERT INTO job_fts(job_fts, rowid, company, position, requirements)
+        VALUES ('delete', old.id, old.company, old.position, old.requirements);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE OF company, position, requirements, status ON job
+    BEGIN
+        INSERT INTO job_fts(job_fts, rowid, company, position, requirements)
+        SELECT 'delete', old.id, old.company, old.position, old.requirements
+        WHERE old.status = 'active';
+        INSERT INTO job_fts(rowid, company, position, requirements)
+        SELECT new.id, new.company, new.position, new.requirements
+        WHERE new.status = 'active';
+    END
+    """,
+]
+
+MYSQL_FULLTEXT_DDL = (
+    f"ALTER TABLE job ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} (company, position, requirements)"
+)
+
+
+def install_job_search(job_table):
+    """Create the dialect's search index whenever the job table is created."""
+    event.listen(job_table, 'after_create', DDL(MYSQL_FULLTEXT_DDL).execute_if(dialect='mysql'))
+    for statement in SQLITE_FTS_DDL:
+        event.listen(job_table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(job_table, 'before_drop', DDL('DROP TABLE IF EXISTS job_fts').execute_if(dialect='sqlite'))
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def fts5_match_expression(terms):
+    # Quote every term so user input can never form FTS5 syntax; the last
+    # term is a prefix match to support search-as-you-type
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += '*'
+    return ' OR '.join(quoted)
+
+
+def search_jobs(session, query, limit, offset):
+    """Return active jobs matching ``query``, best match first.
+
+    Rows carry id, company, position, created_at and a ``score`` where
+    higher means more relevant.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    dialect = session.get_bind().dialect.name
+    params = {'limit': limit, 'offset': offset}
+
+    if dialect == 'sqlite':
+        params['match'] = fts5_match_expression(terms)
+        # bm25() is lower-is-better; weight company and position above requirements
+        sql = text("""
+            SELECT job.id, job.company, job.position, job.created_at,
+                   -bm25(job_fts, 5.0, 3.0, 1.0) AS score
+            FROM job_fts JOIN job ON job.id = job_fts.rowid
+            WHERE job_fts MATCH :match AND job.status = 'active'
+            ORDER BY bm25(job_fts, 5.0, 3.0, 1.0)
+            LIMIT :limit OFFSET :offset
+        """)
+    elif dialect == 'mysql':
+        params['q'] = ' '.join(terms)
+        sql = text("""
+            SELECT id, company, position, created_at,
+                   MATCH(company, position, requirements) AGAINST (:q IN NATURAL LANGUAGE MODE) AS score
+            FROM job
+            WHERE status = 'active'
+              AND MATCH(company, position, requirements) AGAINST (:q IN NATURAL LANGUAGE MODE)
+            ORDER BY score DESC, id DESC
+            LIMIT :limit OFFSET :offset
+        """)
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    sql = sql.columns(id=Integer, company=String, position=String, created_at=DateTime, score=Float)
+    return session.execute(sql, params).all()
+
+
+def rebuild_job_search(session):
+    """Recreate the search index from the job table and return the indexed row count."""
+    dialect = session.get_bind().dialect.name
+
+    if dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            session.execute(text(statement))
+        session.execute(text("INSERT INTO job_fts(job_fts) VALUES ('delete-all')"))
+        session.execute(text("""
+            INSERT INTO job_fts(rowid, company, position, requirements)
+            SELECT id, company, position, requirements FROM job WHERE status = 'active'
+        """))
+    elif dialect == 'mysql':
+        exists = session.execute(text("""
+            SELECT COUNT(*) FROM information_schema.statistics
+            WHERE table_schema = DATABASE() AND table_name = 'job' AND index_name = :name
+        """), {'name': MYSQL_FULLTEXT_INDEX}).scalar()
+        if exists:
+            session.execute(text(f"ALTER TABLE job DROP INDEX {MYSQL_FULLTEXT_INDEX}"))
+        session.execute(text(MYSQL_FULLTEXT_DDL))
+    else:
+        raise NotImplementedError(f"Full-text search is not supported on {dialect}")
+
+    session.commit()
+    return session.execute(text("SELECT COUNT(*) FROM job WHERE status = 'active'")).scalar()
@@ -0,0 +1,239 @@
+"""Synthetic dataset generator for load and scale testing.
+
+Generates students, employers and TPOs spread across institutes, jobs and
+applications with a realistic skew. A few institutes hold most students, a
+few employers post most jobs, popular jobs draw most applications, and a
+long tail of students applies to many jobs. The same seed always produces
+the same rows.
+
+Rows go in as batched multi-row INSERTs with explicit ids, so no ids are
+read back. Every account shares one precomputed password hash. On MySQL
+unique and foreign-key checks are switched off for the loading session. On
+SQLite the loading connection runs with ``synchronous=OFF``.
+
+Run it through the app's CLI:
+
+    flask --app app seed-data --students 200000 --jobs 20000 --applications 2000000
+"""
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from ingest import batched
+
+POSITIONS = [
+    'Software Engineering Intern', 'Backend Developer Intern', 'Frontend Developer Intern',
+    'Data Analyst Intern', 'Data Science Intern', 'Machine Learning Intern', 'QA Engineer Intern',
+    'DevOps Intern', 'Product Management Intern', 'Business Analyst Intern', 'UI/UX Design Intern',
+    'Cloud Engineer Intern', 'Security Analyst Intern', 'Embedded Systems Intern', 'Marketing Intern'
+]
+SKILLS = [
+    'Python', 'Java', 'C++', 'JavaScript', 'TypeScript', 'React', 'SQL', 'MySQL', 'Django', 'Flask',
+    'Spring Boot', 'AWS', 'Docker', 'Kubernetes', 'Linux', 'Git', 'Machine Learning', 'Statistics',
+    'Excel', 'Tableau', 'Figma', 'Communication', 'Problem solving', 'Data structures', 'Networking'
+]
+DEPARTMENTS = ['Computer Science', 'Information Technology', 'Electronics', 'Mechanical', 'Civil', 'Electrical']
+FIRST_NAMES = ['Aarav', 'Vivaan', 'Aditya', 'Ananya', 'Diya', 'Isha', 'Kabir', 'Meera', 'Rohan', 'Saanvi',
+               'Arjun', 'Kavya', 'Nikhil', 'Priya', 'Rahul', 'Sneha', 'Tanvi', 'Varun', 'Neha', 'Om']
+LAST_NAMES = ['Sharma', 'Patel', 'Deshmukh', 'Kulkarni', 'Iyer', 'Reddy', 'Nair', 'Gupta', 'Joshi', 'Bade',
+              'Singh', 'Mehta', 'Rao', 'Chopra', 'Pawar', 'Shinde', 'Jain', 'Das', 'Menon', 'Verma']
+
+MAX_APPLICATIONS_PER_STUDENT = 200
+# executemany needs the same keys in every row
+USER_OPTIONAL_FIELDS = ('first_name', 'last_name', 'institute', 'department', 'company_name', 'company_website')
+
+
+def zipf_weights(count, exponent, rng):
+    """Zipf-distributed weights assigned to ``count`` items in random order."""
+    weights = [1 / rank ** exponent for rank in range(1, count + 1)]
+    rng.shuffle(weights)
+    return weights
+
+
+class WeightedPicker:
+    """Draw indexes proportionally to fixed weights in O(log n)."""
+
+    def __init__(self, weights, rng):
+        self.cumulative = list(itertools.accumulate(weights))
+        self.total = self.cumulative[-1]
+        self.rng = rng
+
+    def pick(self):
+        return bisect.bisect_right(self.cumulative, self.rng.random() * self.total)
+
+
+def _user(user_id, username, user_type, password_hash, created_at, **fields):
+    email = f'{username}@example.com'
+    row = dict.fromkeys(USER_OPTIONAL_FIELDS)
+    row.update(fields)
+    return dict(row, id=user_id, username=username, username_normalized=username, email=email,
+                email_normalized=email, user_type=user_type, password_hash=password_hash,
+                is_active=True, is_verified=True, requires_password_reset=False, created_at=created_at)
+
+
+def generate_users(options, rng, password_hash, first_id, now):
+    """Yield user rows: TPOs, then employers, then students."""
+    institutes = [f"{options['prefix'].title()} Institute of Technology {i + 1}" for i in range(options['institutes'])]
+    institute_picker = WeightedPicker(zipf_weights(len(institutes), 1.0, rng), rng)
+    prefix = options['prefix']
+    days = options['days']
+    user_id = first_id
+
+    def created():
+        return now - timedelta(seconds=rng.randrange(days * 86400))
+
+    for i in range(options['tpos']):
+        yield _user(user_id, f'{prefix}_tpo{i}', 'tpo', password_hash, created(),
+                    first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                    institute=institutes[i % len(institutes)], department=rng.choice(DEPARTMENTS))
+        user_id += 1
+    for i in range(options['employers']):
+        yield _user(user_id, f'{prefix}_employer{i}', 'employer', password_hash, created(),
+                    first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                    company_name=f'{prefix.title()} Company {i}',
+                    company_website=f'https://company{i}.example.com')
+        user_id += 1
+    for i in range(options['students']):
+        yield _user(user_id, f'{prefix}_student{i}', 'student', password_hash, created(),
+                    first_name=rng.choice(FIRST_NAMES), last_name=rng.choice(LAST_NAMES),
+                    institute=institutes[institute_picker.pick()], department=rng.choice(DEPARTMENTS))
+        user_id += 1
+
+
+def generate_jobs(options, rng, employer_ids, company_names, first_id, now, created_at_out):
+    """Yield job rows; a few employers post most of them. Fills ``created_at_out`` by position."""
+    employer_picker = WeightedPicker(zipf_weights(len(employer_ids), 1.1, rng), rng)
+    days = options['days']
+    for i in range(options['jobs']):
+        employer = employer_picker.pick()
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        created_at_out.append(created_at)
+        yield {
+            'id': first_id + i,
+            'company': company_names[employer],
+            'position': rng.choice(POSITIONS),
+            'requirements': ', '.join(rng.sample(SKILLS, rng.randint(3, 7))),
+            'employer_id': employer_ids[employer],
+            'created_at': created_at,
+            'status': 'closed' if rng.random() < options['closed_share'] else 'active'
+        }
+
+
+def application_quotas(count, students, rng):
+    """Split ``count`` applications over students with a heavy (Pareto) tail."""
+    weights = [rng.paretovariate(1.5) for _ in range(students)]
+    scale = count / sum(weights)
+    quotas = [min(MAX_APPLICATIONS_PER_STUDENT, int(weight * scale)) for weight in weights]
+    shortfall = count - sum(quotas)
+    attempts = 0
+    while shortfall > 0 and attempts < count * 4:
+        index = rng.randrange(students)
+        if quotas[index] < MAX_APPLICATIONS_PER_STUDENT:
+            quotas[index] += 1
+            shortfall -= 1
+        attempts += 1
+    return quotas
+
+
+def generate_applications(options, rng, student_ids, first_job_id, job_created_at, first_id, now):
+    """Yield application rows; popular jobs draw most applications, no pair repeats."""
+    job_count = len(job_created_at)
+    job_picker = WeightedPicker(zipf_weights(job_count, 1.05, rng), rng)
+    quotas = application_quotas(options['applications'], len(student_ids), rng)
+    statuses = ['pending', 'accepted', 'rejected']
+    status_weights = [70, 10, 20]
+    application_id = first_id
+    for student_id, quota in zip(student_ids, quotas):
+        # Keep well below the job count so drawing distinct jobs stays cheap
+        quota = min(quota, max(1, job_count // 2))
+        chosen = set()
+        while len(chosen) < quota:
+            chosen.add(job_picker.pick())
+        for job in sorted(chosen):
+            posted = job_created_at[job]
+            yield {
+                'id': application_id,
+                'job_id': first_job_id + job,
+                'student_id': student_id,
+                'status': rng.choices(statuses, status_weights)[0],
+                'date_applied': posted + (now - posted) * rng.random()
+            }
+            application_id += 1
+
+
+def _prepare_connection(connection):
+    """Relax durability/constraint checks for this connection; returns what to restore."""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        previous = connection.exec_driver_sql('PRAGMA synchronous').scalar()
+        connection.exec_driver_sql('PRAGMA synchronous=OFF')
+        return f'PRAGMA synchronous={previous}'
+    if dialect == 'mysql':
+        connection.exec_driver_sql('SET SESSION unique_checks=0, foreign_key_checks=0')
+        return 'SET SESSION unique_checks=1, foreign_key_checks=1'
+    return None
+
+
+def _load(engine, table, rows, batch_size, label):
+    start = time.perf_counter()
+    total = 0
+    with engine.connect() as connection:
+        # PRAGMA synchronous cannot change inside a transaction, so settle it before the first batch
+        restore = _prepare_connection(connection)
+        connection.commit()
+        try:
+            for batch in batched(rows, batch_size):
+                connection.execute(table.insert(), batch)
+                connection.commit()
+                total += len(batch)
+        finally:
+            connection.rollback()
+            if restore:
+                connection.exec_driver_sql(restore)
+                connection.commit()
+    elapsed = time.perf_counter() - start
+    print(f"  {label}: {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:.0f} rows/s)")
+    return total
+
+
+def _next_id(engine, table):
+    with engine.connect() as connection:
+        return (connection.execute(select(func.max(table.c.id))).scalar() or 0) + 1
+
+
+def seed_database(engine, user_table, job_table, application_table, password_hash, options):
+    """Generate and load the dataset described by ``options``; returns row counts."""
+    rng = random.Random(options['seed'])
+    now = options.get('now') or datetime.utcnow().replace(microsecond=0)
+    batch_size = options['batch_size']
+    counts = {}
+    start = time.perf_counter()
+
+    first_user_id = _next_id(engine, user_table)
+    counts['users'] = _load(engine, user_table, generate_users(options, rng, password_hash, first_user_id, now),
+                            batch_size, 'users')
+    first_employer_id = first_user_id + options['tpos']
+    employer_ids = list(range(first_employer_id, first_employer_id + options['employers']))
+    company_names = [f"{options['prefix'].title()} Company {i}" for i in range(options['employers'])]
+    first_student_id = first_employer_id + options['employers']
+    student_ids = list(range(first_student_id, first_student_id + options['students']))
+
+    job_created_at = []
+    first_job_id = _next_id(engine, job_table)
+    counts['jobs'] = _load(engine, job_table, generate_jobs(options, rng, employer_ids, company_names, first_job_id,
+                                                            now, job_created_at), batch_size, 'jobs')
+
+    if job_created_at and student_ids:
+        first_application_id = _next_id(engine, application_table)
+        counts['applications'] = _load(engine, application_table, generate_applications(
+            options, rng, student_ids, first_job_id, job_created_at, first_application_id, now
+        ), batch_size, 'applications')
+    else:
+        counts['applications'] = 0
+
+    counts['seconds'] = round(time.perf_counter() - start, 1)
+    return counts
@@ -0,0 +1,159 @@
+"""State shared by every worker process on one host.
+
+Both tables here are fixed-size arrays of slots in a memory-mapped file;
+updates take an flock() so every process sees a consistent slot.
+
+A VersionTable holds (version, last-modified) slots. Any process can bump a slot after a write and every
+other process sees the new version on its next read, without a round-trip
+to the database or a message bus. Per-process caches store the version
+they were filled at and treat a mismatch as an invalidation.
+
+A TokenBuckets table holds (tokens, updated) slots for rate limiting: each
+key's bucket refills continuously at its rate up to its burst size.
+
+Keys hash onto a fixed number of slots, so two keys can share a slot. For
+versions that only causes extra cache misses (a stale value is never served
+as fresh); for buckets, two clients occasionally share one allowance.
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to a per-process lock
+    fcntl = None
+
+HEADER = struct.Struct('<8sQ')  # magic, epoch
+
+
+class SlotTable:
+    MAGIC = None
+    SLOT = None
+
+    def __init__(self, path, slots=65536):
+        self.path = path
+        self.slots = slots
+        self._size = HEADER.size + self.SLOT.size * slots
+        self._map = None
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _open(self):
+        # Reopen after fork(): flock() on an inherited descriptor would not
+        # exclude the parent process
+        if self._map is not None and self._pid == os.getpid():
+            return self._map
+        with self._lock:
+            if self._map is not None and self._pid == os.getpid():
+                return self._map
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            self._flock(fd, True)
+            try:
+                # The epoch is random per file so versions from a deleted and
+                # recreated table can never be mistaken for current ones
+                if os.fstat(fd).st_size < self._size:
+                    os.ftruncate(fd, self._size)
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    os.write(fd, HEADER.pack(self.MAGIC, int.from_bytes(os.urandom(8), 'little')))
+                mapped = mmap.mmap(fd, self._size)
+            finally:
+                self._flock(fd, False)
+            magic, _ = HEADER.unpack_from(mapped, 0)
+            if magic != self.MAGIC:
+                raise ValueError(f"{self.path} is not a {type(self).__name__} file")
+            self._fd = fd
+            self._pid = os.getpid()
+            self._map = mapped
+            return mapped
+
+    @property
+    def epoch(self):
+        # Read from the file each time: bump_all() replaces it under running processes
+        return HEADER.unpack_from(self._open(), 0)[1]
+
+    @staticmethod
+    def _flock(fd, exclusive):
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_UN)
+
+    def _offset(self, key):
+        if isinstance(key, int):
+            index = key % self.slots
+        else:
+            index = zlib.crc32(str(key).encode()) % self.slots
+        return HEADER.size + self.SLOT.size * index
+
+    def _update(self, key, change):
+        """Replace ``key``'s slot with ``change(*slot)`` under the file lock; returns the new slot."""
+        mapped = self._open()
+        offset = self._offset(key)
+        with self._lock:
+            self._flock(self._fd, True)
+            try:
+                slot = change(*self.SLOT.unpack_from(mapped, offset))
+                self.SLOT.pack_into(mapped, offset, *slot)
+            finally:
+                self._flock(self._fd, False)
+        return slot
+
+
+class VersionTable(SlotTable):
+    MAGIC = b'VERSTBL1'
+    SLOT = struct.Struct('<Qd')  # version, last-modified (unix time)
+
+    def get(self, key):
+        return self.SLOT.unpack_from(self._open(), self._offset(key))[0]
+
+    def last_modified(self, key):
+        return self.SLOT.unpack_from(self._open(), self._offset(key))[1]
+
+    def bump(self, key):
+        """Advance the version of ``key``'s slot and return the new version."""
+        return self._update(key, lambda version, modified: (version + 1, time.time()))[0]
+
+    def bump_all(self):
+        """Advance every slot and start a new epoch, invalidating everything
+        stored under this table (e.g. after ids are reused)."""
+        mapped = self._open()
+        now = time.time()
+        with self._lock:
+            self._flock(self._fd, True)
+            try:
+                HEADER.pack_into(mapped, 0, self.MAGIC, int.from_bytes(os.urandom(8), 'little'))
+                for offset in range(HEADER.size, self._size, self.SLOT.size):
+                    version, _ = self.SLOT.unpack_from(mapped, offset)
+                    self.SLOT.pack_into(mapped, offset, version + 1, now)
+            finally:
+                self._flock(self._fd, False)
+
+
+class TokenBuckets(SlotTable):
+    MAGIC = b'TOKBKT01'
+    SLOT = struct.Struct('<dd')  # tokens, updated (unix time; 0 = never used)
+
+    def take(self, key, rate, burst, cost=1.0):
+        """Spend ``cost`` tokens from ``key``'s bucket.
+
+        The bucket refills at ``rate`` tokens per second up to ``burst``.
+        Returns 0.0 when the tokens were spent, otherwise the seconds until
+        enough will have accumulated (nothing is spent then).
+        """
+        wait = 0.0
+
+        def refill_and_spend(tokens, updated):
+            nonlocal wait
+            now = time.time()
+            tokens = burst if not updated else min(burst, tokens + max(0.0, now - updated) * rate)
+            if tokens >= cost:
+                return tokens - cost, now
+            wait = (cost - tokens) / rate
+            return tokens, now
+
+        self._update(key, refill_and_spend)
+        return wait
@@ -0,0 +1,151 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Try to get cached user info immediately
+    const cachedUser = localStorage.getItem('user');
+    if (cachedUser) {
+        try {
+            const userData = JSON.parse(cachedUser);
+            document.getElementById('username-display').textContent = userData.username || '';
+            // Skip API call if we have cached data
+            displayUserInfo(userData);
+            return;
+        } catch (e) {
+            console.error("Error parsing cached user data:", e);
+        }
+    }
+
+    // If no cached data, load from API
+    loadUserFromAPI();
+});
+
+// Prevent flashing/redirect loop
+let redirectAttempted = false;
+
+// Check if user is logged in
+const token = localStorage.getItem('token');
+if (!token) {
+    window.location.href = '/login';
+} else {
+    console.log("Token exists in localStorage");
+}
+
+// Display error message
+function showError(message) {
+    const errorDiv = document.getElementById('error-message');
+    errorDiv.textContent = message;
+    errorDiv.style.display = 'block';
+}
+
+// Hide error message
+function hideError() {
+    document.getElementById('error-message').style.display = 'none';
+}
+
+// Function to fetch user profile from API
+async function loadUserFromAPI() {
+    try {
+        console.log("Fetching fresh user data from API...");
+
+        const response = await fetch('/api/profile', {
+            headers: {
+                'Authorization': `Bearer ${token}`
+            }
+        });
+
+        console.log("API response status:", response.status);
+
+        if (response.ok) {
+            const data = await response.json();
+            console.log("Profile data:", data);
+
+            if (data.status === 'success' && data.user) {
+                // Hide any error message
+                hideError();
+
+                // Display user info
+                displayUserInfo(data.user);
+
+                // Update cached user data
+                localStorage.setItem('user', JSON.stringify(data.user));
+            } else {
+                showError("Failed to load user data. Using cached data if available.");
+            }
+        } else {
+            // Try to use cached data instead
+            const cachedUser = localStorage.getItem('user');
+            if (cachedUser) {
+                try {
+                    const userData = JSON.parse(cachedUser);
+                    displayUserInfo(userData);
+                } catch (e) {
+                    console.error("Error using cached user data:", e);
+                }
+            } else {
+                showError("Authentication failed. Please log in again.");
+
+                // Only redirect once to prevent loops
+                if (!redirectAttempted) {
+                    redirectAttempted = true;
+                    setTimeout(() => {
+                        localStorage.removeItem('token');
+                        localStorage.removeItem('user');
+                        window.location.href = '/login';
+                    }, 3000); // Wait 3 seconds before redirecting
+                }
+            }
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        // Try to use cached data on network error
+        const cachedUser = localStorage.getItem('user');
+        if (cachedUser) {
+            try {
+                const userData = JSON.parse(cachedUser);
+                displayUserInfo(userData);
+                showError("Network error, using cached data.");
+            } catch (e) {
+                console.error("Error using cached user data:", e);
+                showError("Network error: " + error.message);
+            }
+        } else {
+            showError("Network error: " + error.message);
+        }
+    }
+}
+
+// Display user information
+function displayUserInfo(user) {
+    // Hide loading spinner
+    document.getElementById('loading-spinner').style.display = 'none';
+
+    const userInfo = document.getElementById('user-info');
+    userInfo.innerHTML = `
+        <div class="card mt-4">
+            <div class="card-header bg-primary text-white">
+                User Information
+            </div>
+            <div class="card-body">
+                <div class="row">
+                    <div class="col-md-6">
+                        <p><strong>Username:</strong> ${user.username || 'N/A'}</p>
+                        <p><strong>User Type:</strong> ${user.user_type || 'N/A'}</p>
+                    </div>
+                    <div class="col-md-6">
+                        <p><strong>Name:</strong> ${user.first_name || ''} ${user.last_name || ''}</p>
+                        <p><strong>Email:</strong> ${user.email || 'N/A'}</p>
+                    </div>
+                </div>
+            </div>
+        </div>
+    `;
+
+    // Also update navbar
+    document.getElementById('username-display').textContent = user.username || '';
+}
+
+// Logout functionality
+document.getElementById('logout').addEventListener('click', (e) => {
+    e.preventDefault();
+    localStorage.removeItem('token');
+    localStorage.removeItem('user');
+    window.location.href = '/login';
+});
@@ -0,0 +1,80 @@
+// Check if already logged in
+const token = localStorage.getItem('token');
+if (token) {
+    window.location.href = '/dashboard';
+}
+
+// Show error message
+function showError(message) {
+    const errorDiv = document.getElementById('error-message');
+    errorDiv.textContent = message;
+    errorDiv.style.display = 'block';
+    document.getElementById('success-message').style.display = 'none';
+}
+
+// Show success message
+function showSuccess(message) {
+    const successDiv = document.getElementById('success-message');
+    successDiv.textContent = message;
+    successDiv.style.display = 'block';
+    document.getElementById('error-message').style.display = 'none';
+}
+
+document.getElementById('loginForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    // Clear previous messages
+    document.getElementById('error-message').style.display = 'none';
+    document.getElementById('success-message').style.display = 'none';
+
+    const formData = {
+        username: document.getElementById('username').value,
+        password: document.getElementById('password').value,
+        user_type: document.getElementById('userType').value
+    };
+
+    try {
+        console.log("Submitting login data:", formData);
+
+        const response = await fetch('/api/login', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+        console.log("Login response:", data);
+
+        if (response.ok) {
+            if (data.access_token) {
+                showSuccess('Login successful! Redirecting to dashboard...');
+
+                // Clear any existing token
+                localStorage.removeItem('token');
+
+                // Store the new token
+                localStorage.setItem('token', data.access_token);
+                console.log("Token stored:", data.access_token.substring(0, 20) + "...");
+
+                // Store user data as well
+                if (data.user) {
+                    localStorage.setItem('user', JSON.stringify(data.user));
+                }
+
+                // Wait to ensure the token is stored
+                setTimeout(() => {
+                    window.location.href = '/dashboard';
+                }, 1500);
+            } else {
+                showError('Login successful but no token received');
+            }
+        } else {
+            showError(data.message || 'Login failed');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        showError('An error occurred during login');
+    }
+});
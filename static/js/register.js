@@ -0,0 +1,54 @@
+const userTypeSelect = document.getElementById('userType');
+const employerFields = document.getElementById('employerFields');
+
+userTypeSelect.addEventListener('change', () => {
+    if (userTypeSelect.value === 'employer') {
+        employerFields.style.display = 'block';
+        document.getElementById('companyName').required = true;
+        document.getElementById('companyWebsite').required = true;
+    } else {
+        employerFields.style.display = 'none';
+        document.getElementById('companyName').required = false;
+        document.getElementById('companyWebsite').required = false;
+    }
+});
+
+document.getElementById('registerForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = {
+        username: document.getElementById('username').value,
+        email: document.getElementById('email').value,
+        password: document.getElementById('password').value,
+        first_name: document.getElementById('firstName').value,
+        last_name: document.getElementById('lastName').value,
+        user_type: document.getElementById('userType').value
+    };
+
+    if (formData.user_type === 'employer') {
+        formData.company_name = document.getElementById('companyName').value;
+        formData.company_website = document.getElementById('companyWebsite').value;
+    }
+
+    try {
+        const response = await fetch(`/register/${formData.user_type}`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(formData)
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            alert('Registration successful! Please login.');
+            window.location.href = '/login';
+        } else {
+            alert(data.error || 'Registration failed');
+        }
+    } catch (error) {
+        console.error('Error:', error);
+        alert('An error occurred during registration');
+    }
+});
@@ -0,0 +1,134 @@
+"""Frontend pages and assets served from memory as precompressed bytes.
+
+The HTML templates take no per-request data (everything is fetched by the
+page's own scripts), so each one is rendered once at startup. Each is kept
+with gzip (and brotli, when installed) variants and a strong ETag per
+variant. Files under ``static/`` are fingerprinted with a hash of their
+content: templates link them through ``asset_url('js/login.js')``, which
+gives ``/assets/js/login.<hash>.js``. Any edit changes the URL, so these
+responses can be cached for a year without revalidation.
+
+Pages are sent with ``no-cache``: browsers and proxies keep them but check
+the ETag on every load, which costs a 304. Only the current build's assets
+are served, so a page cached past a deploy would link to fingerprints that
+now return 404.
+
+With ``app.debug`` on, pages and the manifest are rebuilt on every request
+so template edits show up without a restart.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+
+from flask import Response, abort, request
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+ASSET_MAX_AGE = 365 * 24 * 3600
+
+
+class PrecompressedBody:
+    """One resource with its identity, gzip and brotli encodings and their ETags."""
+
+    def __init__(self, body, mimetype, cache_control):
+        self.mimetype = mimetype
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()
+        # Encodings only worth keeping when they are actually smaller
+        self.variants = {'identity': body}
+        compressed = gzip.compress(body, 9, mtime=0)
+        if len(compressed) < len(body):
+            self.variants['gzip'] = compressed
+        if brotli is not None:
+            compressed = brotli.compress(body, quality=11)
+            if len(compressed) < len(body):
+                self.variants['br'] = compressed
+
+    def etag(self, encoding):
+        # Each encoding is a different representation and needs its own strong tag
+        return self.digest[:32] if encoding == 'identity' else f'{self.digest[:32]}-{encoding}'
+
+    def _negotiate(self):
+        accepted = request.accept_encodings
+        for encoding in ('br', 'gzip'):
+            if encoding in self.variants and accepted[encoding]:
+                return encoding
+        return 'identity'
+
+    def response(self):
+        encoding = self._negotiate()
+        if any(request.if_none_match.contains(self.etag(e)) for e in self.variants):
+            response = Response(status=304)
+        else:
+            response = Response(self.variants[encoding], mimetype=self.mimetype)
+            if encoding != 'identity':
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(self.etag(encoding))
+        response.headers['Cache-Control'] = self.cache_control
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+class StaticPages:
+    def __init__(self, app=None):
+        self.pages = {}
+        self.assets = {}  # fingerprinted path -> PrecompressedBody
+        self.manifest = {}  # logical path -> fingerprinted path
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.jinja_env.globals['asset_url'] = self.asset_url
+        app.add_url_rule('/assets/<path:filename>', 'asset', self.serve_asset)
+        self.build()
+
+    def build(self):
+        """Fingerprint every static file, then render every HTML template."""
+        manifest = {}
+        assets = {}
+        static_folder = self.app.static_folder
+        if static_folder and os.path.isdir(static_folder):
+            for root, _, files in os.walk(static_folder):
+                for name in files:
+                    path = os.path.join(root, name)
+                    logical = os.path.relpath(path, static_folder).replace(os.sep, '/')
+                    with open(path, 'rb') as f:
+                        body = f.read()
+                    stem, ext = os.path.splitext(logical)
+                    fingerprinted = f'{stem}.{hashlib.sha256(body).hexdigest()[:12]}{ext}'
+                    mimetype = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+                    manifest[logical] = fingerprinted
+                    assets[fingerprinted] = PrecompressedBody(
+                        body, mimetype, f'public, max-age={ASSET_MAX_AGE}, immutable')
+        self.manifest, self.assets = manifest, assets
+
+        pages = {}
+        with self.app.app_context():
+            for name in self.app.jinja_env.list_templates(extensions=['html']):
+                body = self.app.jinja_env.get_template(name).render().encode()
+                pages[name] = PrecompressedBody(body, 'text/html', 'no-cache')
+        self.pages = pages
+
+    def asset_url(self, logical):
+        return f'/assets/{self.manifest[logical]}'
+
+    def serve(self, template):
+        if self.app.debug:
+            self.build()
+        page = self.pages.get(template)
+        if page is None:
+            abort(404)
+        return page.response()
+
+    def serve_asset(self, filename):
+        if self.app.debug:
+            self.build()
+        asset = self.assets.get(filename)
+        if asset is None:
+            abort(404)
+        return asset.response()
@@ -0,0 +1,248 @@
+"""Durable background tasks for work that does not have to finish inside the request.
+
+A view commits its essential write, calls ``task_queue.enqueue(...)`` and
+returns; the follow-up (notifications) runs on worker threads. Tasks are rows in a SQLite file under ``LOCAL_STATE_DIR``, so they
+survive restarts and are shared by every worker process on the host.
+
+- Claiming a task is one ``BEGIN IMMEDIATE`` transaction, so two workers never
+  run the same row. A claim holds a lease; a task whose worker died is picked
+  up again once the lease runs out.
+- A failed attempt is retried after an exponential backoff with jitter,
+  up to the task's ``max_attempts``; after that it is kept as ``failed``.
+- An idempotency key makes a repeated enqueue a no-op for as long as the
+  finished task is retained (``TASK_RETENTION_SECONDS``).
+- Handlers run inside an app context and must tolerate running twice: a
+  crash between the handler's commit and the task being marked done
+  replays it.
+
+Every process that serves requests starts ``TASK_WORKERS`` threads on its
+first request (0 leaves the work to ``flask run-tasks``). Queue depth and
+the age of the oldest ready task are exported as gauges. Queue wait and run
+time per task are exported as histograms.
+
+Enqueueing happens after the request's own commit and is not part of that
+transaction: a process killed in between loses the task.
+"""
+import atexit
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+TASK_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    idempotency_key TEXT UNIQUE,
+    state TEXT NOT NULL DEFAULT 'queued',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    run_at REAL NOT NULL,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_until REAL,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_tasks_state_run_at ON tasks (state, run_at);
+"""
+
+
+class TaskQueue:
+    def __init__(self, path, workers=2, poll_interval=1.0, lease_seconds=60.0,
+                 backoff_base=2.0, backoff_max=300.0, retention_seconds=7 * 24 * 3600):
+        self.path = path
+        self.app = None
+        self.metrics = None
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retention_seconds = retention_seconds
+        self.handlers = {}  # name -> (function, max_attempts)
+        self._local = threading.local()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._started_pid = None
+        self._start_lock = threading.Lock()
+        self._last_prune = 0.0
+
+    def init_app(self, app, metrics=None):
+        self.app = app
+        self.metrics = metrics
+        app.before_request(self._start_on_first_request)
+        atexit.register(self.stop)
+
+    def _start_on_first_request(self):
+        if self._started_pid != os.getpid():
+            self.start()
+
+    def _connect(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def task(self, name, max_attempts=5):
+        """Register the decorated function as the handler for ``name``; it receives the payload dict."""
+        def decorator(function):
+            self.handlers[name] = (function, max_attempts)
+            return function
+        return decorator
+
+    def enqueue(self, name, payload=None, key=None, delay=0.0):
+        """Queue ``name`` with ``payload``; returns the task id, or None when ``key`` was already used."""
+        if name not in self.handlers:
+            raise KeyError(f"No task handler registered for {name!r}")
+        now = time.time()
+        cursor = self._connect().execute(
+            """
+            INSERT INTO tasks (name, payload, idempotency_key, max_attempts, run_at, enqueued_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (idempotency_key) DO NOTHING
+            """,
+            (name, json.dumps(payload or {}), key, self.handlers[name][1], now + delay, now))
+        if not cursor.rowcount:
+            return None
+        self._wakeup.set()
+        return cursor.lastrowid
+
+    def _claim(self):
+        connection = self._connect()
+        now = time.time()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            row = connection.execute(
+                "SELECT id, name, payload, attempts, max_attempts, run_at FROM tasks "
+                "WHERE state = 'queued' AND run_at <= ? ORDER BY run_at LIMIT 1", (now,)).fetchone()
+            if row is None:
+                # Tasks whose worker died mid-run; a task that keeps killing its
+                # worker fails once its attempts are used up
+                connection.execute(
+                    "UPDATE tasks SET state = 'failed', finished_at = ?, lease_until = NULL, "
+                    "last_error = 'Worker died during the last attempt' "
+                    "WHERE state = 'running' AND lease_until < ? AND attempts >= max_attempts", (now, now))
+                row = connection.execute(
+                    "SELECT id, name, payload, attempts, max_attempts, run_at FROM tasks "
+                    "WHERE state = 'running' AND lease_until < ? AND attempts < max_attempts "
+                    "ORDER BY lease_until LIMIT 1", (now,)).fetchone()
+            if row is not None:
+                connection.execute(
+                    "UPDATE tasks SET state = 'running', attempts = attempts + 1, started_at = ?, lease_until = ? "
+                    "WHERE id = ?", (now, now + self.lease_seconds, row[0]))
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return row
+
+    def backoff(self, attempts):
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run_one(self):
+        """Claim and run one ready task; returns False when nothing was ready."""
+        row = self._claim()
+        if row is None:
+            return False
+        task_id, name, payload, attempts, max_attempts, run_at = row
+        attempts += 1
+        started = time.time()
+        self._observe('task_queue_wait_seconds', name, max(0.0, started - run_at))
+        connection = self._connect()
+        try:
+            function = self.handlers[name][0]
+            with self.app.app_context():
+                function(json.loads(payload))
+        except Exception as e:
+            finished = time.time()
+            if name in self.handlers and attempts < max_attempts:
+                state, run_again = 'queued', finished + self.backoff(attempts)
+            else:
+                state, run_again = 'failed', run_at
+            connection.execute(
+                "UPDATE tasks SET state = ?, run_at = ?, finished_at = ?, lease_until = NULL, last_error = ? "
+                "WHERE id = ?", (state, run_again, finished if state == 'failed' else None, repr(e)[:1000], task_id))
+            logger.exception("Task failed", extra={'task': name, 'task_id': task_id, 'attempt': attempts,
+                                                  'will_retry': state == 'queued'})
+            result = 'retry' if state == 'queued' else 'failed'
+        else:
+            finished = time.time()
+            connection.execute(
+                "UPDATE tasks SET state = 'done', finished_at = ?, lease_until = NULL, last_error = NULL "
+                "WHERE id = ?", (finished, task_id))
+            result = 'success'
+        self._observe('task_duration_seconds', name, finished - started)
+        if self.metrics is not None:
+            self.metrics.store.inc('task_runs_total', (('result', result), ('task', name)))
+            self.metrics.flush_if_due()
+        return True
+
+    def _observe(self, metric, name, seconds):
+        if self.metrics is not None:
+            self.metrics.store.observe(metric, (('task', name),), seconds, TASK_BUCKETS)
+
+    def prune(self):
+        """Forget finished tasks older than the retention period (and their idempotency keys)."""
+        cutoff = time.time() - self.retention_seconds
+        return self._connect().execute(
+            "DELETE FROM tasks WHERE state IN ('done', 'failed') AND finished_at < ?", (cutoff,)).rowcount
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() - self._last_prune > 60:
+                    self._last_prune = time.monotonic()
+                    self.prune()
+                if self.run_one():
+                    continue
+            except Exception:
+                logger.exception("Task worker error")
+            # Local enqueues wake us at once; other processes' tasks are found by polling
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self, workers=None):
+        """Start the worker threads for this process (once per pid)."""
+        workers = self.workers if workers is None else workers
+        with self._start_lock:
+            if not workers or self._started_pid == os.getpid():
+                return
+            self._started_pid = os.getpid()
+            self._stop.clear()
+            self._threads = [threading.Thread(target=self._work, name=f'task-worker-{i}', daemon=True)
+                             for i in range(workers)]
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+        self._started_pid = None
+
+    def depth(self):
+        """Tasks per state, plus the age of the oldest ready task; for gauges."""
+        connection = self._connect()
+        counts = dict(connection.execute('SELECT state, COUNT(*) FROM tasks GROUP BY state').fetchall())
+        oldest = connection.execute(
+            "SELECT MIN(run_at) FROM tasks WHERE state = 'queued' AND run_at <= ?", (time.time(),)).fetchone()[0]
+        return counts, time.time() - oldest if oldest else 0.0
@@ -0,0 +1,69 @@
+"""Both FastJSONProvider paths (orjson and stdlib) must produce the same bytes."""
+import collections
+import decimal
+import enum
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy import create_engine, text
+
+import json_provider
+from json_provider import FastJSONProvider
+
+pytest.importorskip('orjson')
+
+Point = collections.namedtuple('Point', 'x y')
+
+
+class Status(enum.Enum):
+    ACTIVE = 'active'
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.json = FastJSONProvider(app)
+    return app
+
+
+def payload():
+    with create_engine('sqlite://').connect() as connection:
+        rows = connection.execute(text(
+            "SELECT 1 AS id, 'Zoë Ünternehmen 株式会社' AS company, 'Développeuse' AS position")).all()
+    return {
+        'jobs': rows,
+        'company': 'Société Générale',
+        'created_at': datetime(2024, 5, 1, 12, 30, 15, 250000),
+        'updated_at': datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc),
+        'day': date(2024, 5, 1),
+        'salary': decimal.Decimal('1234.50'),
+        'token': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'point': Point(1, 2),
+        'status': Status.ACTIVE,
+        'score': 0.1234,
+        'counts': {2: 'b', 1: 'a'},
+        'nested': [None, True, [1, 2.5]],
+    }
+
+
+def both_paths(monkeypatch, render):
+    fast = render()
+    monkeypatch.setattr(json_provider, 'orjson', None)
+    return fast, render()
+
+
+def test_dumps_matches(app, monkeypatch):
+    fast, stdlib = both_paths(monkeypatch, lambda: app.json.dumps(payload()))
+    assert fast == stdlib
+    assert 'Zoë Ünternehmen 株式会社' in fast
+
+
+@pytest.mark.parametrize('debug', [False, True])
+def test_response_matches(app, monkeypatch, debug):
+    app.debug = debug
+    with app.app_context():
+        fast, stdlib = both_paths(monkeypatch, lambda: app.json.response(payload()).get_data())
+    assert fast == stdlib
+    assert 'Société Générale'.encode() in fast
@@ -0,0 +1,98 @@
+"""SQL statements per request for the listing endpoints.
+
+Each listing is one projected query, so the count must not grow with the
+number of rows (no lazy load per application, job or account).
+"""
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+
+STATE_DIR = tempfile.mkdtemp(prefix='query-counts-')
+os.environ.update({
+    'DATABASE_URL': f"sqlite:///{os.path.join(STATE_DIR, 'app.db')}",
+    'LOCAL_STATE_DIR': STATE_DIR,
+    'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',
+    'PASSWORD_HASH_WORKERS': '0',
+    'RATE_LIMIT_ENABLED': '0',
+    'TASK_WORKERS': '0',
+    'LOG_LEVEL': 'WARNING',
+})
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import Job, JobApplication, User, app, db, password_hasher  # noqa: E402
+
+PASSWORD = 'test-password'
+STUDENTS = 3
+JOBS = 10
+TPOS = 5
+
+
+@pytest.fixture(scope='module')
+def client():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        password_hash = password_hasher.hash(PASSWORD)
+
+        def account(username, user_type, **fields):
+            user = User(username=username, email=f'{username}@example.com', user_type=user_type,
+                        password_hash=password_hash, is_active=True, **fields)
+            db.session.add(user)
+            return user
+
+        account('admin', 'super_admin')
+        employer = account('employer', 'employer', company_name='Acme')
+        students = [account(f'student{i}', 'student') for i in range(STUDENTS)]
+        for i in range(TPOS):
+            account(f'tpo{i}', 'tpo', institute=f'Institute {i}')
+        db.session.flush()
+
+        now = datetime.utcnow()
+        jobs = [Job(company='Acme', position=f'Intern {i}', requirements='python sql',
+                    employer_id=employer.id, created_at=now - timedelta(minutes=i)) for i in range(JOBS)]
+        db.session.add_all(jobs)
+        db.session.flush()
+        db.session.add_all(JobApplication(job_id=job.id, student_id=students[0].id) for job in jobs)
+        db.session.commit()
+    yield app.test_client()
+
+
+def token(client, username, user_type):
+    response = client.post('/api/login', json={'username': username, 'password': PASSWORD, 'user_type': user_type})
+    assert response.status_code == 200, response.get_json()
+    return {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+
+
+@contextmanager
+def count_statements():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', record)
+
+
+@pytest.mark.parametrize('path, username, user_type, key, rows', [
+    ('/api/jobs/applied', 'student0', 'student', 'applications', JOBS),
+    ('/api/jobs/available', 'student1', 'student', 'jobs', JOBS),
+    ('/api/admin/tpos', 'admin', 'super_admin', 'tpos', TPOS),
+])
+def test_listing_is_one_statement(client, path, username, user_type, key, rows):
+    headers = token(client, username, user_type)
+    with count_statements() as statements:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_json()
+    assert len(response.get_json()[key]) == rows
+    assert len(statements) == 1, statements